@@ -0,0 +1,33 @@
+from typing import List, Tuple
+
+# Keyword heuristics used by the mock classifier, checked in order; first match wins.
+CATEGORY_RULES: List[Tuple[str, List[str]]] = [
+    ("Billing", ["charge", "billing", "invoice", "payment"]),
+    ("Login", ["login", "signin", "sign-in", "password", "authentication"]),
+    ("Performance", ["slow", "lag", "performance", "timeout"]),
+    ("Question/How-To", ["how do i", "how to", "can i", "is it possible"]),
+    ("Bug", ["crash", "error", "bug", "exception", "500", "404", "429"]),
+]
+
+SEVERITY_RULES: List[Tuple[str, List[str]]] = [
+    ("Critical", ["data loss", "security", "breach", "cannot access", "down", "unavailable"]),
+    ("High", ["crash", "500", "not working", "fails", "error"]),
+    ("Medium", ["slow", "sometimes", "intermittent", "occasionally"]),
+]
+
+
+def _first_match(rules: List[Tuple[str, List[str]]], text: str, default: str) -> str:
+    for label, keywords in rules:
+        if any(w in text for w in keywords):
+            return label
+    return default
+
+
+def keyword_category(text: str) -> str:
+    """Category from keyword rules; expects lower-cased text."""
+    return _first_match(CATEGORY_RULES, text, "Other")
+
+
+def keyword_severity(text: str) -> str:
+    """Severity from keyword rules; expects lower-cased text."""
+    return _first_match(SEVERITY_RULES, text, "Low")
@@ -0,0 +1,205 @@
+import heapq
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# NumPy is imported inside VectorIndex methods so that importing this module
+# (and agent.tools) stays cheap; only the embeddings path needs it.
+
+# (position in the index, score), best first
+Hits = List[Tuple[int, float]]
+
+# publish() runs in worker threads; serialize it so concurrent first
+# searches do not each write (and leak) a copy of the same index
+_publish_lock = threading.Lock()
+
+
+class LexicalIndex:
+    """
+    Pre-tokenized KB texts for token-overlap scoring.
+    score = |query ∩ entry| / |entry|, as in search_kb_mock.
+    """
+
+    def __init__(self, token_sets: List[FrozenSet[str]], shareable: bool = True) -> None:
+        self.token_sets = token_sets
+        self.shareable = shareable
+        self._published: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.token_sets)
+
+    def subset(self, positions: List[int], shareable: bool = True) -> "LexicalIndex":
+        return LexicalIndex([self.token_sets[i] for i in positions], shareable)
+
+    def search(self, query_tokens: Set[str], top_n: int) -> Hits:
+        scores = [
+            len(query_tokens & tokens) / len(tokens) if tokens else 0.0
+            for tokens in self.token_sets
+        ]
+        # nlargest is equivalent to a stable sort + slice: ties keep KB order
+        best = heapq.nlargest(top_n, range(len(scores)), key=scores.__getitem__)
+        return [(i, scores[i]) for i in best]
+
+    def publish(self) -> str:
+        """Write the index to a temp file that worker processes can load."""
+        with _publish_lock:
+            if self._published is None:
+                fd, path = tempfile.mkstemp(prefix="kb-lexical-", suffix=".pkl")
+                with open(fd, "wb") as f:
+                    pickle.dump(self.token_sets, f, protocol=pickle.HIGHEST_PROTOCOL)
+                self._published = path
+            return self._published
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        with open(path, "rb") as f:
+            return cls(pickle.load(f))
+
+
+class VectorIndex:
+    """
+    Row-normalized float32 embedding matrix; cosine similarity is a single
+    matrix-vector product (NumPy releases the GIL while computing it).
+    """
+
+    def __init__(self, matrix: "np.ndarray", shareable: bool = True) -> None:
+        self.matrix = matrix
+        self.shareable = shareable
+        self._published: Optional[str] = None
+
+    @classmethod
+    def from_embeddings(cls, embeddings: Iterable[List[float]]) -> "VectorIndex":
+        import numpy as np
+
+        matrix = np.asarray(list(embeddings), dtype=np.float32)
+        if matrix.size:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1.0, norms)
+        return cls(matrix)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def subset(self, positions: List[int], shareable: bool = True) -> "VectorIndex":
+        return VectorIndex(self.matrix[positions], shareable)
+
+    def search(self, query: Any, top_n: int) -> Hits:
+        import numpy as np
+
+        if not len(self) or top_n <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        scores = self.matrix @ (q / (np.linalg.norm(q) or 1.0))
+        k = min(top_n, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        # Best score first, ties by position (same order as a stable sort)
+        order = np.lexsort((candidates, -scores[candidates]))
+        return [(int(candidates[i]), float(scores[candidates[i]])) for i in order]
+
+    def publish(self) -> str:
+        """Write the matrix to a .npy file that worker processes memory-map."""
+        import numpy as np
+
+        with _publish_lock:
+            if self._published is None:
+                fd, path = tempfile.mkstemp(prefix="kb-vectors-", suffix=".npy")
+                with open(fd, "wb") as f:
+                    np.save(f, self.matrix)
+                self._published = path
+            return self._published
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        import numpy as np
+
+        # Memory-mapped: all worker processes share the same pages
+        return cls(np.load(path, mmap_mode="r"))
+
+
+class PartitionedIndex:
+    """
+    A global index plus one sub-index per value of a metadata field
+    (the KB entry "category" by default), so filtered searches only score
+    the partitions they ask for.
+
+    plan() returns the (index, positions) pairs to search, where positions
+    maps a sub-index row back to its row in the global index / entries list
+    (None for the global index itself).
+    """
+
+    def __init__(self, index: Any, entries: List[Dict[str, Any]], field: str = "category") -> None:
+        self.index = index
+        self.entries = entries
+        self.field = field
+        groups: Dict[Any, List[int]] = {}
+        for i, entry in enumerate(entries):
+            groups.setdefault(entry.get(field), []).append(i)
+        self.partitions: Dict[Any, Tuple[Any, List[int]]] = {
+            value: (index.subset(positions), positions) for value, positions in groups.items()
+        }
+
+    def shared_indexes(self) -> List[Any]:
+        """The global index and every partition: the indexes worth publishing to worker processes."""
+        return [self.index] + [sub for sub, _ in self.partitions.values()]
+
+    def plan(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Tuple[Any, Optional[List[int]]]]:
+        if categories is None and where is None:
+            return [(self.index, None)]
+
+        if categories is not None:
+            parts = [self.partitions[c] for c in dict.fromkeys(categories) if c in self.partitions]
+        else:
+            parts = [(self.index, list(range(len(self.entries))))]
+
+        if where is None:
+            return parts
+        planned = []
+        for sub, positions in parts:
+            keep = [p for p in positions if where(self.entries[p])]
+            if len(keep) == len(positions):
+                planned.append((sub, positions))
+            elif keep:
+                # Ad-hoc subset for this query only: not worth publishing to worker processes
+                planned.append((self.index.subset(keep, shareable=False), keep))
+        return planned
+
+
+def merge_hits(results: List[Tuple[Hits, Optional[List[int]]]], top_n: int) -> Hits:
+    """Map per-partition hits back to global positions and keep the overall top_n."""
+    merged = [
+        (positions[i] if positions is not None else i, score)
+        for hits, positions in results
+        for i, score in hits
+    ]
+    merged.sort(key=lambda h: (-h[1], h[0]))
+    return merged[:top_n]
+
+
+_INDEX_TYPES = {"LexicalIndex": LexicalIndex, "VectorIndex": VectorIndex}
+
+# Per-process cache of published indexes (worker side)
+_loaded: Dict[str, Any] = {}
+
+
+def search_published(kind: str, path: str, query: Any, top_n: int) -> Hits:
+    """Entry point for worker processes: search an index published with .publish()."""
+    index = _loaded.get(path)
+    if index is None:
+        index = _loaded[path] = _INDEX_TYPES[kind].load(path)
+    return index.search(query, top_n)
+
+
+def discard_published(*indexes: Any) -> None:
+    for index in indexes:
+        if index is not None and index._published:
+            Path(index._published).unlink(missing_ok=True)
+            index._published = None
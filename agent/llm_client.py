@@ -1,13 +1,24 @@
 import os
-from typing import Dict
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from typing import Dict, List
 import json
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from openai import OpenAIError
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 import asyncio
 
-load_dotenv()
+from app.config import settings
+from .heuristics import keyword_category, keyword_severity
+from .metrics import metrics
+from .prompt import PROMPT_VERSION, build_messages
+
+
+def is_openai_error(exc: BaseException) -> bool:
+    """
+    isinstance(exc, OpenAIError) without importing the (slow to import) openai
+    SDK up front; by the time an API error exists the SDK is loaded anyway.
+    """
+    from openai import OpenAIError
+
+    return isinstance(exc, OpenAIError)
+
 
 class LLMClientMock:
     """
@@ -47,29 +58,8 @@ class LLMClientMock:
         if len(summary) > 120:
             summary = summary[:117].rsplit(" ", 1)[0] + "..."
 
-        # Category heuristic
-        if any(w in text for w in ["charge", "billing", "invoice", "payment"]):
-            category = "Billing"
-        elif any(w in text for w in ["login", "signin", "sign-in", "password", "authentication"]):
-            category = "Login"
-        elif any(w in text for w in ["slow", "lag", "performance", "timeout"]):
-            category = "Performance"
-        elif any(w in text for w in ["how do i", "how to", "can i", "is it possible"]):
-            category = "Question/How-To"
-        elif any(w in text for w in ["crash", "error", "bug", "exception", "500", "404", "429"]):
-            category = "Bug"
-        else:
-            category = "Other"
-
-        # Severity heuristic
-        if any(w in text for w in ["data loss", "security", "breach", "cannot access", "down", "unavailable"]):
-            severity = "Critical"
-        elif any(w in text for w in ["crash", "500", "not working", "fails", "error"]):
-            severity = "High"
-        elif any(w in text for w in ["slow", "sometimes", "intermittent", "occasionally"]):
-            severity = "Medium"
-        else:
-            severity = "Low"
+        category = keyword_category(text)
+        severity = keyword_severity(text)
 
         return {
             "summary": summary,
@@ -86,48 +76,40 @@ class LLMClient:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.model_name = os.getenv("MODEL_NAME", "gpt-4o-mini")
+        # Created on first use, so constructing LLMClient stays cheap
         self.client = None
+        self.use_mock = not self.api_key
+
+    def _get_client(self):
+        if self.client is None:
+            from openai import AsyncOpenAI
 
-        if self.api_key:
             self.client = AsyncOpenAI(api_key=self.api_key)
-            self.use_mock = False
-        else:
-            self.use_mock = True
+        return self.client
 
     async def classify_ticket(self, description: str) -> Dict[str, str]:
-        return await self._openai_classify(description)
+        # Built (and counted) once per ticket, not once per retry attempt
+        budget = settings.PROMPT_TOKEN_BUDGET if settings.PROMPT_COMPACTION_ENABLED else None
+        messages, stats = build_messages(description, budget)
+        metrics.incr(f"prompt_calls.{PROMPT_VERSION}")
+        metrics.incr("prompt_tokens_in", stats["tokens_in"])
+        metrics.incr("prompt_tokens_out", stats["tokens_out"])
+        metrics.incr("prompt_tokens_saved", stats["tokens_in"] - stats["tokens_out"])
+        metrics.observe("prompt_tokens_saved_ratio",
+                        1 - stats["tokens_out"] / stats["tokens_in"] if stats["tokens_in"] else 0.0)
+        return await self._openai_classify(description, messages)
     
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type(OpenAIError)
+        retry=retry_if_exception(is_openai_error)
     )
-    async def _openai_classify(self, description: str) -> Dict[str, str]:
-
-        system_message = (
-            "You are a support ticket triage assistant. "
-            "You MUST respond with a single JSON object only, no explanation, no markdown."
-        )
-
-        user_message = f"""
-        Extract the following information from the support ticket.
-
-        Ticket: "{description}"
-
-        Return ONLY a JSON object with exactly these keys:
-        - summary: string, 1 sentence summary
-        - category: one of ["Billing", "Login", "Performance", "Bug", "Question/How-To", "Other"]
-        - severity: one of ["Low", "Medium", "High", "Critical"]
-        """
-
+    async def _openai_classify(self, description: str, messages: List[Dict[str, str]]) -> Dict[str, str]:
         try:
-            resp = await self.client.chat.completions.create(
+            resp = await self._get_client().chat.completions.create(
                 model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message},
-                ],
+                messages=messages,
                 temperature=0.0,
                 response_format={"type": "json_object"},
             )
@@ -135,9 +117,9 @@ class LLMClient:
             content = resp.choices[0].message.content
             result = json.loads(content)
             return result
-        except OpenAIError as e:
-            print(f"OpenAI API Error: {e}")
-            raise e
         except Exception as e:
+            if is_openai_error(e):
+                print(f"OpenAI API Error: {e}")
+                raise e
             print("Failed to parse LLM response or other error, using mock fallback. Error:", e)
             return await LLMClientMock()._mock_classify(description)
\ No newline at end of file
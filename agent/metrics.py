@@ -0,0 +1,76 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+class _Series:
+    """
+    Summary of an observed value: count/sum/max over the process lifetime
+    plus percentiles over the most recent `window` observations.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * p))] if recent else 0.0
+
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+        }
+
+
+class Metrics:
+    """
+    Tiny in-process metrics registry (counters + value series), exposed on /metrics.
+    Safe to update from worker threads.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._window = window
+        self.counters: Dict[str, float] = {}
+        self.series: Dict[str, _Series] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            if name not in self.series:
+                self.series[name] = _Series(self._window)
+            self.series[name].observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "series": {name: s.snapshot() for name, s in self.series.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.series.clear()
+
+
+metrics = Metrics()
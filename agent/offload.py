@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from .kb_index import Hits, PartitionedIndex, discard_published, merge_hits, search_published
+from .metrics import metrics
+
+
+def _timed(submitted: float, fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    """Runs in the worker: returns (result, seconds spent queued, seconds spent running)."""
+    started = time.time()
+    result = fn(*args)
+    return result, started - submitted, time.time() - started
+
+
+class RetrievalExecutor:
+    """
+    Runs KB scoring off the event loop so a large KB or a long ticket
+    does not stall every other request on the worker.
+
+    mode:
+    - "inline":  score on the event loop (no dispatch overhead)
+    - "thread":  bounded thread pool; NumPy releases the GIL for vector search
+    - "process": process pool; indexes are published once to temp files and
+                 memory-mapped by the workers, so only the query crosses processes
+
+    Indexes smaller than `min_entries` are always scored inline, where the
+    dispatch overhead would cost more than the scoring itself. One-off indexes
+    (shareable=False) are never published to processes; they use a thread.
+
+    Publishing writes the whole index to disk, so it happens in prepare()
+    during warm-up, or in a worker thread on first use. The files are deleted
+    by discard() when an index is replaced, and by shutdown().
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 4, min_entries: int = 1000) -> None:
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown retrieval executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.min_entries = min_entries
+        self._pool: Optional[Executor] = None
+        # Indexes published to temp files, by id(), so their files can be removed
+        self._shared: Dict[int, Any] = {}
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kb-search")
+        return self._pool
+
+    def _offloaded(self, index: Any) -> bool:
+        return self.mode != "inline" and len(index) >= self.min_entries
+
+    def prepare(self, index: PartitionedIndex) -> None:
+        """Publish an index and its partitions ahead of the first search (blocking; run from warm-up)."""
+        if self.mode != "process":
+            return
+        for sub in index.shared_indexes():
+            if self._offloaded(sub):
+                self._shared[id(sub)] = sub
+                sub.publish()
+
+    async def _publish(self, index: Any) -> str:
+        if index._published is not None:
+            return index._published
+        self._shared[id(index)] = index
+        # Writing a large index takes a while: keep it off the event loop
+        return await asyncio.to_thread(index.publish)
+
+    def discard(self, index: PartitionedIndex) -> None:
+        """Remove the published files of an index that is being replaced."""
+        subs = index.shared_indexes()
+        for sub in subs:
+            self._shared.pop(id(sub), None)
+        discard_published(*subs)
+
+    async def plan(
+        self,
+        index: PartitionedIndex,
+        categories: Optional[Iterable[str]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Tuple[Any, Optional[List[int]]]]:
+        """
+        PartitionedIndex.plan(), run off the event loop when it has to evaluate
+        a `where` predicate over a large index (the predicate and the row copy
+        for the filtered subset are both O(entries)).
+        """
+        if where is None or not self._offloaded(index.index):
+            return index.plan(categories, where)
+        # The predicate may not be picklable: use threads even in process mode
+        pool = self._get_pool() if self.mode == "thread" else None
+        loop = asyncio.get_running_loop()
+        parts, queued, ran = await loop.run_in_executor(pool, _timed, time.time(), index.plan, categories, where)
+        metrics.observe("retrieval_plan_seconds", ran)
+        return parts
+
+    async def search(self, index: Any, query: Any, top_n: int) -> Hits:
+        if not self._offloaded(index):
+            metrics.incr("retrieval_inline")
+            return index.search(query, top_n)
+
+        pool: Optional[Executor] = self._get_pool()
+        if self.mode == "process" and index.shareable:
+            fn, args = search_published, (type(index).__name__, await self._publish(index), query, top_n)
+        else:
+            fn, args = index.search, (query, top_n)
+            if self.mode == "process":
+                # One-off index (e.g. a metadata-filtered subset): use the default thread pool
+                pool = None
+
+        loop = asyncio.get_running_loop()
+        hits, queued, ran = await loop.run_in_executor(pool, _timed, time.time(), fn, *args)
+        metrics.incr(f"retrieval_offloaded.{self.mode if pool is not None else 'thread'}")
+        metrics.observe("retrieval_queue_seconds", queued)
+        metrics.observe("retrieval_run_seconds", ran)
+        return hits
+
+    async def search_many(self, parts: List[Tuple[Any, Optional[List[int]]]], query: Any, top_n: int) -> Hits:
+        """Search several (sub-)indexes concurrently and merge into global positions."""
+        if len(parts) == 1:
+            index, positions = parts[0]
+            return merge_hits([(await self.search(index, query, top_n), positions)], top_n)
+        results = await asyncio.gather(*(self.search(index, query, top_n) for index, _ in parts))
+        return merge_hits(list(zip(results, (positions for _, positions in parts))), top_n)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        discard_published(*self._shared.values())
+        self._shared.clear()
+
+
+retrieval_executor = RetrievalExecutor(
+    mode=settings.RETRIEVAL_EXECUTOR,
+    max_workers=settings.RETRIEVAL_MAX_WORKERS,
+    min_entries=settings.RETRIEVAL_OFFLOAD_MIN_ENTRIES,
+)
@@ -1,21 +1,58 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from .tools import classify_ticket, search_kb_mock, search_kb_embeddings, decide_next_action
+from .result_store import normalize_description, result_sink
+from .singleflight import SingleFlight
+from .tools import (
+    classify_ticket,
+    decide_next_action,
+    embed_query,
+    kb_categories,
+    search_kb_embeddings,
+    search_kb_mock,
+)
 from app.config import settings
 
+# Identical tickets triaged concurrently (double-submits, retrying integrations)
+# share one computation instead of each calling the LLM and embeddings API.
+_inflight = SingleFlight()
+
 
 async def triage_ticket(description: str) -> Dict[str, Any]:
+    """
+    Triage a ticket, coalescing concurrent requests with the same normalized description.
+    The returned dict may be shared between callers and must not be mutated.
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        result, query_embedding = await _triage_ticket(description)
+    else:
+        result, query_embedding = await _inflight.do(
+            normalize_description(description), lambda: _triage_ticket(description)
+        )
+    # One triage log row per caller, so coalesced repeats still count as repeats.
+    # Non-blocking: queued in memory and written in the background.
+    result_sink.submit(dict(result, description=description, embedding=query_embedding))
+    return result
+
+
+async def _triage_ticket(description: str) -> Tuple[Dict[str, Any], Optional[list]]:
     """
     Main agent orchestration:
     1. Classify ticket (summary, category, severity)
     2. Search KB for related issues
     3. Decide known/new issue and next action
+    Returns the result and the query embedding (None in mock mode).
     """
     ticket_meta = await classify_ticket(description)
-    if settings.MOCK_LLM in ("1", "true", "yes"):
-        kb_matches = await search_kb_mock(description, top_n=3)
+    query_embedding = None
+    # Look in the ticket's own category first; falls back to the whole KB on weak matches
+    categories = kb_categories(ticket_meta["category"]) if settings.KB_PARTITIONED_SEARCH else None
+    if settings.MOCK_LLM:
+        kb_matches = await search_kb_mock(description, top_n=3, categories=categories)
     else:
-        kb_matches = await search_kb_embeddings(description, top_n=3)
+        query_embedding = await embed_query(description)
+        kb_matches = await search_kb_embeddings(
+            description, top_n=3, query_embedding=query_embedding, categories=categories
+        )
     known_issue, next_action = decide_next_action(ticket_meta, kb_matches)
 
     # Only expose a subset of KB fields externally
@@ -29,7 +66,7 @@ async def triage_ticket(description: str) -> Dict[str, Any]:
         for e in kb_matches
     ]
 
-    return {
+    result = {
         "summary": ticket_meta["summary"],
         "category": ticket_meta["category"],
         "severity": ticket_meta["severity"],
@@ -37,3 +74,4 @@ async def triage_ticket(description: str) -> Dict[str, Any]:
         "related_issues": related_issues,
         "next_action": next_action,
     }
+    return result, query_embedding
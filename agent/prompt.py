@@ -0,0 +1,256 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .heuristics import CATEGORY_RULES, SEVERITY_RULES
+
+# Bump whenever SYSTEM_PROMPT changes, so results/metrics can be attributed to a template.
+PROMPT_VERSION = "triage-v2"
+
+CATEGORIES = ["Billing", "Login", "Performance", "Bug", "Question/How-To", "Other"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+
+# Static prefix: identical on every call so provider-side prompt caching can reuse it.
+# The ticket text is the only variable part and goes last, in the user message.
+SYSTEM_PROMPT = (
+    "You are a support ticket triage assistant. "
+    "Reply with one JSON object only, no markdown, with exactly these keys: "
+    '"summary" (one sentence), '
+    f'"category" (one of {", ".join(CATEGORIES)}), '
+    f'"severity" (one of {", ".join(SEVERITIES)}). '
+    "The user message is the ticket text; it may have been shortened, "
+    "with omissions marked by [...]."
+)
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_MASK_RE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+_STACK_FRAME_RE = re.compile(r'^\s*(File ".*", line \d+|at [\w$.<>]+\(.*\)|#\d+\s+0x[0-9a-f]+)')
+_QUOTE_HEADER_RE = re.compile(r"^(On .+ wrote:|-+\s*Original Message\s*-+|From: .+)$", re.IGNORECASE)
+_SIGNOFF_RE = re.compile(
+    r"^(--\s*|(best|kind|warm)?\s*regards,?|thanks( and regards)?,?|cheers,?|sent from my .+)$",
+    re.IGNORECASE,
+)
+_MAIL_HEADER_RE = re.compile(r"^(Sent|To|Cc|Date|Subject):", re.IGNORECASE)
+# At most this many non-empty lines after a sign-off are treated as a signature
+_MAX_SIGNATURE_LINES = 4
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_ERROR_HINT_RE = re.compile(r"\b([45]\d\d|\w+(Error|Exception)|timeout|failed|fatal)\b", re.IGNORECASE)
+
+_KEYWORDS = [w for _, words in CATEGORY_RULES + SEVERITY_RULES for w in words]
+
+_encoder: Any = None
+
+
+def _get_encoder() -> Any:
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False
+    return _encoder
+
+
+def _local_token_cost(token: str) -> int:
+    return (len(token) + 3) // 4
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens locally. Uses tiktoken when it is installed, otherwise a
+    word-piece estimate (~4 chars per token for long words, 1 per symbol).
+    """
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    return sum(_local_token_cost(t) for t in _WORD_RE.findall(text))
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Longest prefix of `text` that is at most `budget` tokens (by count_tokens)."""
+    encoder = _get_encoder()
+    if encoder:
+        return encoder.decode(encoder.encode(text)[: max(budget, 0)])
+    used, end = 0, 0
+    for match in _WORD_RE.finditer(text):
+        used += _local_token_cost(match.group())
+        if used > budget:
+            break
+        end = match.end()
+    return text[:end]
+
+
+def _quoted_reply_follows(lines: List[str]) -> bool:
+    """True if the lines after a reply header look like quoted mail: "> ..." or Sent:/To:/Subject: headers."""
+    following = [l.strip() for l in lines if l.strip()][:3]
+    return bool(following) and any(l.startswith(">") or _MAIL_HEADER_RE.match(l) for l in following)
+
+
+def _signature_start(lines: List[str]) -> int:
+    """
+    Index of the sign-off line that starts the trailing signature block, or
+    len(lines) if there is none. A sign-off only counts when what follows it
+    is a few short, non-sentence lines (name, company, phone), so a "Thanks"
+    in the middle of a ticket does not swallow the rest of it.
+    """
+    start = len(lines)
+    trailing = 0
+    for i in range(len(lines) - 1, -1, -1):
+        stripped = lines[i].strip()
+        if _SIGNOFF_RE.match(stripped):
+            start = i
+        elif stripped:
+            trailing += 1
+            if trailing > _MAX_SIGNATURE_LINES or len(stripped) > 50 or stripped[-1] in ".!?":
+                break
+    if not any(l.strip() for l in lines[:start]):
+        return len(lines)
+    return start
+
+
+def _strip_quotes_and_signature(lines: List[str]) -> List[str]:
+    """
+    Drop quoted replies ("> ..." lines, everything after an "On ... wrote:" /
+    "From: ..." header that is followed by quoted content) and the trailing
+    sign-off / signature block.
+    """
+    for i, line in enumerate(lines):
+        if _QUOTE_HEADER_RE.match(line.strip()) and _quoted_reply_follows(lines[i + 1:]):
+            lines = lines[:i]
+            break
+    lines = [l for l in lines if not l.strip().startswith(">")]
+    return lines[: _signature_start(lines)]
+
+
+def _collapse_repeats(lines: List[str]) -> List[str]:
+    """
+    Collapse repeated log lines (compared with numbers/hex masked out, so
+    timestamps and ids do not make them unique) and long runs of stack frames.
+    """
+    out: List[str] = []
+    counts: Dict[str, int] = {}
+    first_index: Dict[str, int] = {}
+    frames: List[str] = []
+
+    def flush_frames() -> None:
+        if len(frames) > 4:
+            out.extend(frames[:2])
+            out.append(f"  ... {len(frames) - 4} more frames ...")
+            out.extend(frames[-2:])
+        else:
+            out.extend(frames)
+        frames.clear()
+
+    for line in lines:
+        if _STACK_FRAME_RE.match(line):
+            frames.append(line)
+            continue
+        if frames and line[:1].isspace() and line.strip():
+            # Source line printed under a Python frame belongs to that frame
+            frames[-1] += "\n" + line
+            continue
+        flush_frames()
+        if not line.strip():
+            if out and out[-1].strip():
+                out.append("")
+            continue
+        key = _MASK_RE.sub("#", line.strip())
+        if key in counts:
+            counts[key] += 1
+            continue
+        counts[key] = 1
+        first_index[key] = len(out)
+        out.append(line)
+    flush_frames()
+
+    for key, n in counts.items():
+        if n > 1:
+            out[first_index[key]] += f" [repeated {n}x]"
+    return out
+
+
+def _sentence_score(sentence: str, position: int) -> float:
+    lower = sentence.lower()
+    score = sum(1.0 for w in _KEYWORDS if w in lower)
+    score += 0.5 * len(_ERROR_HINT_RE.findall(sentence))
+    if position == 0:
+        # The opening sentence usually states the problem
+        score += 2.0
+    return score
+
+
+def _fit_budget(text: str, budget: int) -> str:
+    """
+    Keep the most informative sentences (keyword hits, error codes, the opening
+    sentence) that fit into `budget` tokens, in their original order.
+    """
+    sentences = [s for line in text.split("\n") for s in _SENTENCE_SPLIT_RE.split(line) if s.strip()]
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (_sentence_score(sentences[i], i), -i),
+        reverse=True,
+    )
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(sentences[i])
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+
+    if not chosen:
+        # A single huge sentence: cut it to the budget, leaving room for the marker
+        first = sentences[ranked[0]] if sentences else text
+        marker = " [...]"
+        return truncate_tokens(first, budget - count_tokens(marker)).rstrip() + marker
+
+    def assemble(indices: List[int]) -> str:
+        parts, prev = [], -1
+        for i in indices:
+            if i != prev + 1:
+                parts.append("[...]")
+            parts.append(sentences[i].strip())
+            prev = i
+        if prev != len(sentences) - 1:
+            parts.append("[...]")
+        return " ".join(parts)
+
+    # The [...] markers cost tokens too: drop the weakest sentences until it fits
+    picked = [i for i in ranked if i in chosen]
+    text = assemble(sorted(picked))
+    while len(picked) > 1 and count_tokens(text) > budget:
+        picked.pop()
+        text = assemble(sorted(picked))
+    return text
+
+
+def compact_description(description: str, token_budget: int) -> Tuple[str, Dict[str, int]]:
+    """
+    Shrink a ticket description before it is sent to the LLM:
+    strip quoted replies and signatures, collapse repeated log lines and stack
+    frames, then cap it to `token_budget` tokens keeping the most informative sentences.
+    Returns the compacted text and token counts before/after.
+    """
+    tokens_in = count_tokens(description)
+    lines = _collapse_repeats(_strip_quotes_and_signature(description.splitlines()))
+    text = "\n".join(lines).strip() or description.strip()
+    if count_tokens(text) > token_budget:
+        text = _fit_budget(text, token_budget)
+    return text, {"tokens_in": tokens_in, "tokens_out": count_tokens(text)}
+
+
+def build_messages(description: str, token_budget: Optional[int] = None) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Chat messages for classification using the versioned template.
+    Passing token_budget=None sends the description unchanged.
+    """
+    if token_budget is None:
+        text, stats = description, {"tokens_in": count_tokens(description)}
+        stats["tokens_out"] = stats["tokens_in"]
+    else:
+        text, stats = compact_description(description, token_budget)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+    return messages, stats
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from .metrics import metrics
+from .prompt import SEVERITIES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage_log (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    description TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    summary TEXT,
+    category TEXT,
+    severity TEXT,
+    known_issue INTEGER NOT NULL,
+    top_issue_id TEXT,
+    top_score REAL,
+    related_issues TEXT,
+    embedding BLOB,
+    embedding_dim INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_triage_log_unmatched ON triage_log (known_issue, normalized);
+CREATE INDEX IF NOT EXISTS idx_triage_log_created_at ON triage_log (created_at);
+"""
+
+_INSERT = """
+INSERT INTO triage_log (
+    created_at, description, normalized, summary, category, severity,
+    known_issue, top_issue_id, top_score, related_issues, embedding, embedding_dim
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def normalize_description(description: str) -> str:
+    return " ".join(description.lower().split())
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    # WAL: appends don't block readers (e.g. the query tool running alongside the server)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def encode_embedding(embedding: Optional[List[float]]) -> Optional[bytes]:
+    """Store embeddings as packed float32, ~4x smaller than JSON text."""
+    if embedding is None:
+        return None
+    return array("f", embedding).tobytes()
+
+
+def decode_embedding(blob: Optional[bytes]) -> Optional[List[float]]:
+    if blob is None:
+        return None
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+def _to_row(record: Dict[str, Any]) -> tuple:
+    related = record.get("related_issues", [])
+    top = related[0] if related else {}
+    embedding = record.get("embedding")
+    return (
+        record["created_at"],
+        record["description"],
+        normalize_description(record["description"]),
+        record.get("summary"),
+        record.get("category"),
+        record.get("severity"),
+        int(bool(record.get("known_issue"))),
+        top.get("id"),
+        top.get("match_score"),
+        json.dumps(related),
+        encode_embedding(embedding),
+        len(embedding) if embedding is not None else None,
+    )
+
+
+class TriageResultSink:
+    """
+    Asynchronous, append-only log of triage results (SQLite in WAL mode).
+
+    submit() never blocks and never touches the disk: it drops the record into a
+    bounded in-memory queue. A background writer drains the queue in batches and
+    writes them from a worker thread. Each flush takes at least `batch_size`
+    records, or everything queued when the writer is behind, so bursts are
+    written in fewer, bigger transactions; if the queue is full the record
+    is dropped and counted
+    (triage_log_dropped on /metrics) rather than slowing down the request.
+    """
+
+    def __init__(self, path: Path, max_queue: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done() and not self._closing
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._conn = await asyncio.to_thread(connect, self.path)
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush whatever is still queued, then close the database."""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._writer
+        await asyncio.to_thread(self._conn.close)
+        self._writer, self._conn, self._queue = None, None, None
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        if not self.running:
+            return False
+        record.setdefault("created_at", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            metrics.incr("triage_log_dropped")
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        with self._conn:
+            self._conn.executemany(_INSERT, [_to_row(r) for r in batch])
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            metrics.incr("triage_log_write_errors")
+            print(f"Failed to write {len(batch)} triage log records: {e}")
+            return
+        metrics.incr("triage_log_written", len(batch))
+        metrics.observe("triage_log_flush_seconds", time.perf_counter() - started)
+
+    async def _run(self) -> None:
+        while True:
+            # Under bursts, take everything queued so one transaction covers the backlog
+            batch = self._drain(max(self.batch_size, self._queue.qsize()))
+            if batch:
+                await self._flush(batch)
+            elif self._closing:
+                return
+            if len(batch) < self.batch_size and not self._closing:
+                # Partial batch: wait so the next transaction covers more records,
+                # unless a full batch builds up first (submit() wakes us).
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+
+def frequent_unmatched(conn: sqlite3.Connection, min_count: int = 2, since: Optional[float] = None,
+                       limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Tickets that did not match a known KB issue, grouped by normalized text,
+    most frequent first. These are the candidates for new KB entries.
+    """
+    rows = conn.execute(
+        """
+        SELECT normalized, COUNT(*) AS n, MIN(description), MAX(category), MAX(severity),
+               MAX(CASE severity WHEN 'Critical' THEN 3 WHEN 'High' THEN 2
+                                 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 0 END),
+               MAX(top_score), MIN(created_at), MAX(created_at)
+        FROM triage_log
+        WHERE known_issue = 0 AND created_at >= ?
+        GROUP BY normalized
+        HAVING n >= ?
+        ORDER BY n DESC, MAX(created_at) DESC
+        LIMIT ?
+        """,
+        (since or 0.0, min_count, limit),
+    ).fetchall()
+    return [
+        {
+            "count": n,
+            "description": description,
+            "category": category,
+            # Highest severity in the group; MAX(severity) alone would compare the names as text
+            "severity": SEVERITIES[rank] if rank is not None else severity,
+            "best_score": best_score,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+        }
+        for _, n, description, category, severity, rank, best_score, first_seen, last_seen in rows
+    ]
+
+
+def cluster_unmatched(conn: sqlite3.Connection, threshold: float = 0.9, min_count: int = 2,
+                      since: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Like frequent_unmatched, but groups near-duplicate tickets by embedding
+    similarity (greedy, cosine >= threshold) instead of exact text.
+    Only rows that were triaged with embeddings take part.
+    """
+    import numpy as np
+
+    rows = conn.execute(
+        """
+        SELECT description, category, severity, embedding FROM triage_log
+        WHERE known_issue = 0 AND embedding IS NOT NULL AND created_at >= ?
+        ORDER BY created_at
+        """,
+        (since or 0.0,),
+    ).fetchall()
+
+    centroids: List[Any] = []
+    clusters: List[Dict[str, Any]] = []
+    for description, category, severity, blob in rows:
+        vec = np.frombuffer(blob, dtype=np.float32)
+        vec = vec / (np.linalg.norm(vec) or 1.0)
+        if centroids:
+            sims = np.stack(centroids) @ vec
+            best = int(np.argmax(sims))
+            if sims[best] >= threshold:
+                clusters[best]["count"] += 1
+                clusters[best]["categories"][category] = clusters[best]["categories"].get(category, 0) + 1
+                continue
+        centroids.append(vec)
+        clusters.append({"count": 1, "description": description, "severity": severity,
+                         "categories": {category: 1}})
+
+    clusters = [c for c in clusters if c["count"] >= min_count]
+    clusters.sort(key=lambda c: c["count"], reverse=True)
+    return clusters[:limit]
+
+
+result_sink = TriageResultSink(
+    Path(settings.TRIAGE_LOG_PATH),
+    max_queue=settings.TRIAGE_LOG_QUEUE_SIZE,
+    batch_size=settings.TRIAGE_LOG_BATCH_SIZE,
+    flush_interval=settings.TRIAGE_LOG_FLUSH_SECONDS,
+)
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Request coalescing for concurrent identical work.
+    The first caller for a key (the leader) starts the computation in its own task;
+    callers arriving while it is still running await the same task and receive
+    the same result (or exception). Nothing is kept once the task finishes, so
+    this is not a cache: a later call with the same key runs again.
+
+    Cancellation: each caller awaits the shared task through asyncio.shield, so a
+    caller going away (e.g. the client disconnects) does not cancel the work for
+    the others. The task is only cancelled when the last waiter leaves.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._inflight.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _t: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Everyone waiting on this computation is gone
+                self._forget(key, call)
+                call.task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -1,14 +1,18 @@
 import json
 import os
+import re
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-import numpy as np
-from openai import AsyncOpenAI
-from .llm_client import LLMClientMock, LLMClient
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from openai import OpenAIError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .kb_index import Hits, LexicalIndex, PartitionedIndex, VectorIndex
+from .llm_client import LLMClientMock, LLMClient, is_openai_error
+from .metrics import metrics
+from .offload import retrieval_executor
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 from app.config import settings
 
+# Nothing heavy happens at import time: the KB, the LLM / embeddings clients
+# and NumPy are loaded on first use (or by the warm-up task in app.main).
+
 def _get_kb_path() -> Path:
     env_path = os.getenv("KB_PATH")
     if env_path:
@@ -23,18 +27,29 @@ def load_kb() -> List[Dict[str, Any]]:
         return json.load(f)
 
 
-KB_ENTRIES: List[Dict[str, Any]] = load_kb()
-if os.getenv("MOCK_LLM", "true").lower() in ("1", "true", "yes"):
-    llm_client = LLMClientMock()
-else:
-    llm_client = LLMClient()
+KB_ENTRIES: Optional[List[Dict[str, Any]]] = None
+llm_client = None
+
+
+def get_kb_entries() -> List[Dict[str, Any]]:
+    global KB_ENTRIES
+    if KB_ENTRIES is None:
+        KB_ENTRIES = load_kb()
+    return KB_ENTRIES
+
+
+def get_llm_client():
+    global llm_client
+    if llm_client is None:
+        llm_client = LLMClientMock() if settings.MOCK_LLM else LLMClient()
+    return llm_client
 
 
 async def classify_ticket(description: str) -> Dict[str, str]:
     """
     Use LLM (mock / real) to extract summary, category, severity.
     """
-    return await llm_client.classify_ticket(description)
+    return await get_llm_client().classify_ticket(description)
 
 
 def _tokenize(text: str) -> List[str]:
@@ -44,12 +59,37 @@ def _tokenize(text: str) -> List[str]:
         "Login error 500!" -> ["login", "error", "500"]
         "Checkout error 500 on mobile" -> ["checkout", "error", "500", "on", "mobile"]
     """
-    import re
-
     return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if t]
 
 
-async def search_kb_mock(query: str, top_n: int = 3) -> List[Dict[str, Any]]:
+_lexical_cache: Tuple[Any, Any] = (None, None)
+
+
+def get_lexical_index() -> PartitionedIndex:
+    """
+    Token sets for every KB entry (title + symptoms), partitioned by category.
+    Built once per KB_ENTRIES list.
+    """
+    global _lexical_cache
+    kb_entries = get_kb_entries()
+    entries, index = _lexical_cache
+    if entries is not kb_entries:
+        if index is not None:
+            retrieval_executor.discard(index)
+        index = PartitionedIndex(LexicalIndex([
+            frozenset(_tokenize(e["title"] + " " + " ".join(e.get("symptoms", []))))
+            for e in kb_entries
+        ]), kb_entries)
+        _lexical_cache = (kb_entries, index)
+    return index
+
+
+async def search_kb_mock(
+    query: str,
+    top_n: int = 3,
+    categories: Optional[Iterable[str]] = None,
+    where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> List[Dict[str, Any]]:
     """
     Very simple keyword-based similarity search over KB.
     Scores by overlapping tokens between query and (title + symptoms).
@@ -59,40 +99,81 @@ async def search_kb_mock(query: str, top_n: int = 3) -> List[Dict[str, Any]]:
         entry_tokens = {"checkout", "error", "500", "on", "mobile", "payment"}
         overlap = query_tokens & entry_tokens = {"checkout", "error", "500", "on", "mobile"}
         score = len(overlap) / len(entry_tokens) = 5 / 6 ~ 0.83
+    Scoring is CPU bound; on large KBs it runs on the retrieval executor, off the event loop.
+    Optional `categories` / `where` filters are applied as in _filtered_search.
     """
-    # Mock search is CPU bound, but we make it async to match interface if needed,
-    # or just keep it sync and wrap it? 
-    # For consistency with embeddings search, let's make it async.
-    
-    query_tokens = set(_tokenize(query))
-    scored: List[Tuple[float, Dict[str, Any]]] = []
-
-    for entry in KB_ENTRIES:
-        text = entry["title"] + " " + " ".join(entry.get("symptoms", []))
-        entry_tokens = set(_tokenize(text))
-        overlap = query_tokens & entry_tokens
-        if not entry_tokens:
-            score = 0.0
-        else:
-            score = len(overlap) / len(entry_tokens)
-        scored.append((score, entry))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
+    entries = get_kb_entries()
+    hits = await _filtered_search(get_lexical_index(), set(_tokenize(query)), top_n, categories, where)
+
     top_entries: List[Dict[str, Any]] = []
-    for score, entry in scored[:top_n]:
-        e = dict(entry)
+    for i, score in hits:
+        e = dict(entries[i])
         e["match_score"] = round(float(score), 3)
         top_entries.append(e)
 
     return top_entries
 
+# Classifier categories (agent.prompt.CATEGORIES) that are named differently in the KB.
+# "Other" covers the KB categories the classifier has no label for.
+KB_CATEGORY_ALIASES: Dict[str, List[str]] = {
+    "Question/How-To": ["Question"],
+    "Other": ["Email", "API"],
+}
+
+
+def kb_categories(category: str) -> List[str]:
+    """KB entry categories to search for a ticket of the given classifier category."""
+    return KB_CATEGORY_ALIASES.get(category, [category])
+
+
+async def _filtered_search(
+    index: PartitionedIndex,
+    query: Any,
+    top_n: int,
+    categories: Optional[Iterable[str]],
+    where: Optional[Callable[[Dict[str, Any]], bool]],
+) -> Hits:
+    """
+    Search only the partitions matching `categories` (KB entry "category" values)
+    and/or the entries accepted by the `where` predicate. When the filtered
+    best match is weak (below KB_PARTITION_FALLBACK_SCORE) or there is none,
+    fall back to searching the whole KB. If the filter leaves fewer than
+    `top_n` hits, the rest are filled from the whole KB.
+    """
+    if categories is None and where is None:
+        return await retrieval_executor.search_many(index.plan(), query, top_n)
+
+    parts = await retrieval_executor.plan(index, categories, where)
+    hits = await retrieval_executor.search_many(parts, query, top_n) if parts else []
+    if not hits or hits[0][1] < settings.KB_PARTITION_FALLBACK_SCORE:
+        metrics.incr("kb_search_fallback")
+        return await retrieval_executor.search_many(index.plan(), query, top_n)
+
+    metrics.incr("kb_search_filtered")
+    if len(hits) < top_n:
+        # Small partition: fill the remaining slots from the whole KB, after the filtered hits
+        seen = {i for i, _ in hits}
+        rest = await retrieval_executor.search_many(index.plan(), query, top_n + len(hits))
+        hits += [h for h in rest if h[0] not in seen][: top_n - len(hits)]
+    return hits
+
 # -----------------
 # KB Embedding-based search
 # -----------------
 
-client = AsyncOpenAI()
+client = None
 EMB_MODEL = "text-embedding-3-small"
 
+
+def get_embeddings_client():
+    global client
+    if client is None:
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI()
+    return client
+
+
 def load_kb_index():
     path = Path(__file__).resolve().parents[1] / "kb" / "kb_index_embeddings.json"
     with path.open("r") as f:
@@ -109,35 +190,63 @@ def get_kb_index():
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(OpenAIError)
+    retry=retry_if_exception(is_openai_error)
 )
 async def embed_query(query: str) -> list:
     try:
-        resp = await client.embeddings.create(model=EMB_MODEL, input=query)
+        resp = await get_embeddings_client().embeddings.create(model=EMB_MODEL, input=query)
         return resp.data[0].embedding
-    except OpenAIError as e:
-        print(f"OpenAI API Error during embedding: {e}")
+    except Exception as e:
+        if is_openai_error(e):
+            print(f"OpenAI API Error during embedding: {e}")
         raise e
 
 def cosine(a, b):
+    import numpy as np
+
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
-async def search_kb_embeddings(query: str, top_n: int = 3):
-    q_emb = await embed_query(query)
-    scored = []
-    
+
+_vector_cache: Tuple[Any, Any, Any] = (None, None, None)
+
+
+def get_vector_index() -> Tuple[PartitionedIndex, List[Dict[str, Any]]]:
+    """
+    Normalized embedding matrix for the KB index, partitioned by category, plus
+    the KB entries aligned with its rows. Built once per (KB_ENTRIES, KB_EMB_INDEX) pair.
+    """
+    global _vector_cache
+    kb_entries = get_kb_entries()
     kb_index = get_kb_index()
+    entries, emb_index, cached = _vector_cache
+    if entries is not kb_entries or emb_index is not kb_index:
+        if cached is not None:
+            retrieval_executor.discard(cached[0])
+        by_id = {e["id"]: e for e in kb_entries}
+        items = [item for item in kb_index if item["id"] in by_id]
+        aligned = [by_id[item["id"]] for item in items]
+        cached = (
+            PartitionedIndex(VectorIndex.from_embeddings(item["embedding"] for item in items), aligned),
+            aligned,
+        )
+        _vector_cache = (kb_entries, kb_index, cached)
+    return cached
 
-    for item in kb_index:
-        score = cosine(np.array(q_emb), np.array(item["embedding"]))
-        kb_entry = next(e for e in KB_ENTRIES if e["id"] == item["id"])
-        scored.append((float(score), kb_entry))
 
-    scored.sort(key=lambda x: x[0], reverse=True)
+async def search_kb_embeddings(
+    query: str,
+    top_n: int = 3,
+    query_embedding: Optional[list] = None,
+    categories: Optional[Iterable[str]] = None,
+    where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+):
+    q_emb = query_embedding if query_embedding is not None else await embed_query(query)
+    index, entries = get_vector_index()
+    hits = await _filtered_search(index, q_emb, top_n, categories, where)
 
     top = []
-    for score, entry in scored[:top_n]:
-        e = dict(entry)
+    for i, score in hits:
+        e = dict(entries[i])
         e["match_score"] = round(score, 3)
         top.append(e)
 
@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from agent.heuristics import keyword_severity
+from agent.metrics import metrics
+
+# Lower value = served first
+PRIORITIES: Dict[str, int] = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+# Severities that may be shed under overload, in the order they are given up
+SHEDDABLE = ["Low", "Medium"]
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("description", "severity", "priority", "enqueued_at", "future")
+
+    def __init__(self, description: str, severity: str, future: "asyncio.Future[Any]") -> None:
+        self.description = description
+        self.severity = severity
+        self.priority = PRIORITIES[severity]
+        self.enqueued_at = time.perf_counter()
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Bounded priority queue in front of a fixed pool of triage workers.
+
+    Each ticket gets a priority from the cheap keyword severity rules (the ones
+    LLMClientMock uses), so Critical tickets are always dequeued first.
+
+    Overload handling is CoDel-style: queue delay (the dequeued job's sojourn,
+    or the age of the oldest job still waiting if larger) is checked on every
+    dequeue. Once it has stayed above `target` for a full `interval`, the
+    controller starts shedding: queued Low tickets are rejected, as are new
+    ones on arrival; if delay still stays above target for another interval,
+    Medium is shed as well. High and Critical are never shed by delay.
+    A dequeue under target, or an empty queue with an idle worker, ends
+    the shedding state.
+
+    When the queue is full, a new ticket evicts the newest queued ticket of a
+    strictly lower priority, or is rejected itself.
+
+    Rejections carry a Retry-After estimate from the queue length and the
+    recent average service time.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[Any]],
+        workers: int = 16,
+        max_queue: int = 100,
+        target: float = 0.5,
+        interval: float = 2.0,
+    ) -> None:
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.target = target
+        self.interval = interval
+
+        self._heap: List[Tuple[int, int, _Job]] = []
+        self._seq = itertools.count()
+        self._not_empty: Optional[asyncio.Condition] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._idle = 0
+
+        # CoDel state
+        self._above_since: Optional[float] = None
+        self.shed_level = 0  # number of SHEDDABLE severities currently shed
+        self._service_time = 1.0  # EWMA of handler latency, seconds
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._not_empty = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for _, _, job in self._heap:
+            if not job.future.done():
+                job.future.set_exception(AdmissionRejected("Server is shutting down.", self.retry_after()))
+        self._heap = []
+
+    def _shed(self, severity: str) -> bool:
+        return severity in SHEDDABLE[: self.shed_level]
+
+    def retry_after(self) -> int:
+        backlog = len(self._heap) / max(self.workers, 1)
+        return max(1, min(60, math.ceil((backlog + 1) * self._service_time)))
+
+    async def submit(self, description: str) -> Any:
+        if not self.running:
+            # Not started (e.g. no lifespan): no admission control, run directly
+            return await self.handler(description)
+
+        severity = keyword_severity(description.lower())
+        if not self._heap and self._idle:
+            # Queue drained and a worker is free: overload is over (CoDel resets on empty queue)
+            self._reset()
+        if self._shed(severity):
+            metrics.incr(f"admission_shed.{severity}")
+            raise AdmissionRejected("Service is overloaded, low-priority ticket deferred.", self.retry_after())
+
+        job = _Job(description, severity, asyncio.get_running_loop().create_future())
+        if len(self._heap) >= self.max_queue:
+            self._prune()
+        if len(self._heap) >= self.max_queue:
+            self._evict_for(job)
+
+        item = (job.priority, next(self._seq), job)
+        heapq.heappush(self._heap, item)
+        try:
+            async with self._not_empty:
+                self._not_empty.notify()
+            return await job.future
+        except asyncio.CancelledError:
+            # Caller went away (client disconnected): drop the job so it
+            # does not hold a queue slot or count towards queue delay
+            job.future.cancel()
+            self._remove(item)
+            raise
+
+    def _remove(self, item: Tuple[int, int, _Job]) -> None:
+        try:
+            self._heap.remove(item)
+        except ValueError:
+            return  # already dequeued
+        heapq.heapify(self._heap)
+
+    def _prune(self) -> None:
+        """Drop queued jobs that are already finished (cancelled or rejected)."""
+        live = [item for item in self._heap if not item[2].future.done()]
+        if len(live) != len(self._heap):
+            heapq.heapify(live)
+            self._heap = live
+
+    def _evict_for(self, job: _Job) -> None:
+        # Lowest priority, newest first
+        victim = max(self._heap, key=lambda item: (item[0], item[1]))
+        if victim[0] <= job.priority:
+            metrics.incr(f"admission_rejected_full.{job.severity}")
+            raise AdmissionRejected("Triage queue is full.", self.retry_after())
+        self._remove(victim)
+        metrics.incr(f"admission_evicted.{victim[2].severity}")
+        if not victim[2].future.done():
+            victim[2].future.set_exception(AdmissionRejected("Evicted by higher-priority tickets.", self.retry_after()))
+
+    def _reset(self) -> None:
+        self._above_since = None
+        self.shed_level = 0
+
+    def _observe_delay(self, delay: float, now: float) -> None:
+        if delay < self.target:
+            self._reset()
+            return
+        if self._above_since is None:
+            self._above_since = now
+        elif now - self._above_since >= self.interval and self.shed_level < len(SHEDDABLE):
+            # Delay stayed above target for a whole interval: shed one more severity
+            self.shed_level += 1
+            self._above_since = now
+            print(f"Admission: queue delay above {self.target}s, shedding {SHEDDABLE[: self.shed_level]}")
+            self._purge_shed()
+
+    def _purge_shed(self) -> None:
+        """Reject queued jobs of shed severities now, instead of letting them wait to be dropped."""
+        kept = []
+        for item in self._heap:
+            job = item[2]
+            if self._shed(job.severity) and not job.future.done():
+                metrics.incr(f"admission_shed.{job.severity}")
+                job.future.set_exception(
+                    AdmissionRejected("Service is overloaded, low-priority ticket deferred.", self.retry_after())
+                )
+            else:
+                kept.append(item)
+        heapq.heapify(kept)
+        self._heap = kept
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._not_empty:
+                self._idle += 1
+                try:
+                    await self._not_empty.wait_for(lambda: bool(self._heap))
+                finally:
+                    self._idle -= 1
+                _, _, job = heapq.heappop(self._heap)
+            if job.future.done():
+                # Caller went away while queued
+                continue
+
+            now = time.perf_counter()
+            sojourn = now - job.enqueued_at
+            # With priorities, Critical jobs barely wait even when the queue is
+            # backed up, so also look at the oldest job still waiting.
+            oldest = max((now - j.enqueued_at for _, _, j in self._heap if not j.future.done()), default=0.0)
+            self._observe_delay(max(sojourn, oldest), now)
+            metrics.observe(f"admission_queue_seconds.{job.severity}", sojourn)
+            if self._shed(job.severity):
+                metrics.incr(f"admission_shed.{job.severity}")
+                job.future.set_exception(
+                    AdmissionRejected("Service is overloaded, low-priority ticket deferred.", self.retry_after())
+                )
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = await self.handler(job.description)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_exception(AdmissionRejected("Server is shutting down.", self.retry_after()))
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.perf_counter() - started)
@@ -1,6 +1,11 @@
 import os
 from typing import Literal
 
+from dotenv import load_dotenv
+
+# Settings are read from the environment once, at import; pick up .env first.
+load_dotenv()
+
 class Settings:
     ENV: Literal["dev", "prod"] = os.getenv("ENV", "dev").lower()
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -13,4 +18,43 @@ class Settings:
     
     QUERY_MATCH_CONFIDENCE_THRESHOLD: float = float(os.getenv("QUERY_MATCH_CONFIDENCE_THRESHOLD", "0.5"))
 
+    # Admission control for /triage: priority queue + fixed worker pool, CoDel-style shedding
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("true", "1", "yes")
+    ADMISSION_WORKERS: int = int(os.getenv("ADMISSION_WORKERS", "16"))
+    ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+    ADMISSION_TARGET_DELAY_MS: float = float(os.getenv("ADMISSION_TARGET_DELAY_MS", "500"))
+    ADMISSION_INTERVAL_MS: float = float(os.getenv("ADMISSION_INTERVAL_MS", "2000"))
+
+    # Coalesce concurrent identical tickets into one in-flight triage
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("true", "1", "yes")
+
+    # Prompt compaction before LLM classification
+    PROMPT_COMPACTION_ENABLED: bool = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() in ("true", "1", "yes")
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "400"))
+
+    # Search only the KB partition of the ticket's category first
+    KB_PARTITIONED_SEARCH: bool = os.getenv("KB_PARTITIONED_SEARCH", "true").lower() in ("true", "1", "yes")
+    # Below this filtered top score, search the whole KB instead (defaults to the known-issue threshold)
+    KB_PARTITION_FALLBACK_SCORE: float = float(
+        os.getenv("KB_PARTITION_FALLBACK_SCORE", str(QUERY_MATCH_CONFIDENCE_THRESHOLD))
+    )
+
+    # Where KB scoring runs: "inline" (event loop), "thread" or "process" pool
+    RETRIEVAL_EXECUTOR: str = os.getenv("RETRIEVAL_EXECUTOR", "thread").lower()
+    RETRIEVAL_MAX_WORKERS: int = int(os.getenv("RETRIEVAL_MAX_WORKERS", "4"))
+    # KBs smaller than this are scored inline, dispatching would cost more than scoring
+    RETRIEVAL_OFFLOAD_MIN_ENTRIES: int = int(os.getenv("RETRIEVAL_OFFLOAD_MIN_ENTRIES", "1000"))
+
+    # Startup: warm heavy resources (KB, indexes, clients) in the background after boot
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("true", "1", "yes")
+    # Report (and warn) when startup + warm-up takes longer than this
+    STARTUP_BUDGET_SECONDS: float = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+    # Triage log (append-only SQLite store of every triage result)
+    TRIAGE_LOG_ENABLED: bool = os.getenv("TRIAGE_LOG_ENABLED", "true").lower() in ("true", "1", "yes")
+    TRIAGE_LOG_PATH: str = os.getenv("TRIAGE_LOG_PATH", "data/triage_log.db")
+    TRIAGE_LOG_QUEUE_SIZE: int = int(os.getenv("TRIAGE_LOG_QUEUE_SIZE", "10000"))
+    TRIAGE_LOG_BATCH_SIZE: int = int(os.getenv("TRIAGE_LOG_BATCH_SIZE", "256"))
+    TRIAGE_LOG_FLUSH_SECONDS: float = float(os.getenv("TRIAGE_LOG_FLUSH_SECONDS", "1.0"))
+
 settings = Settings()
@@ -1,27 +1,55 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 from contextlib import asynccontextmanager
-import os
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from scripts.build_kb_index_embeddings import build_index, KB_EMB_PATH
 from app.config import settings
-import time
 from collections import defaultdict
 
+from agent.metrics import metrics
+from agent.offload import retrieval_executor
 from agent.orchestrator import triage_ticket
+from agent.result_store import result_sink
+from app.admission import AdmissionController, AdmissionRejected
 from app.schema import TriageRequest, TriageResponse
+from app.warmup import StartupReport, warm_up
+
+startup_report = StartupReport(settings.STARTUP_BUDGET_SECONDS)
+startup_report.mark_origin(_IMPORT_STARTED)
+
+admission = AdmissionController(
+    triage_ticket,
+    workers=settings.ADMISSION_WORKERS,
+    max_queue=settings.ADMISSION_QUEUE_SIZE,
+    target=settings.ADMISSION_TARGET_DELAY_MS / 1000,
+    interval=settings.ADMISSION_INTERVAL_MS / 1000,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Check if embeddings exist
-    if not KB_EMB_PATH.exists():
-        print(f"Embeddings not found at {KB_EMB_PATH}. Generating...")
-        build_index()
+    # Startup: serve immediately, load KB / indexes / clients in the background
+    startup_report.record("import", _IMPORT_LOADED - _IMPORT_STARTED)
+    if settings.TRIAGE_LOG_ENABLED:
+        await result_sink.start()
+    if settings.ADMISSION_ENABLED:
+        admission.start()
+    warmup_task = None
+    if settings.WARMUP_ON_STARTUP:
+        warmup_task = asyncio.create_task(warm_up(startup_report))
     else:
-        print(f"Embeddings found at {KB_EMB_PATH}.")
+        startup_report.finish()
     yield
-    # Shutdown: (nothing to do)
+    # Shutdown: stop warm-up and triage workers, flush pending triage log records, stop retrieval workers
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await admission.stop()
+    await result_sink.stop()
+    retrieval_executor.shutdown()
 
 
 app = FastAPI(title="Support Ticket Triage Agent", lifespan=lifespan)
@@ -29,8 +57,14 @@ app = FastAPI(title="Support Ticket Triage Agent", lifespan=lifespan)
 # Simple in-memory rate limiter
 request_counts = defaultdict(list)
 
+# Probes and scrapes must never be rate limited
+RATE_LIMIT_EXEMPT_PATHS = {"/healthz", "/readyz", "/metrics"}
+
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
+    if request.url.path in RATE_LIMIT_EXEMPT_PATHS:
+        return await call_next(request)
+
     client_ip = request.client.host
     now = time.time()
     
@@ -38,9 +72,12 @@ async def rate_limit_middleware(request: Request, call_next):
     request_counts[client_ip] = [t for t in request_counts[client_ip] if now - t < settings.RATE_LIMIT_WINDOW_SECONDS]
     
     if len(request_counts[client_ip]) >= settings.RATE_LIMIT_REQUESTS:
+        # Seconds until the oldest request in the window expires
+        retry_after = max(1, int(request_counts[client_ip][0] + settings.RATE_LIMIT_WINDOW_SECONDS - now) + 1)
         return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={"detail": "Rate limit exceeded. Please try again later."}
+            content={"detail": "Rate limit exceeded. Please try again later."},
+            headers={"Retry-After": str(retry_after)},
         )
     
     request_counts[client_ip].append(now)
@@ -55,11 +92,41 @@ async def root():
     return {"message": "Support Ticket Agent API. Visit /ui for the interface."}
 
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: warm-up finished, including the startup time budget report."""
+    report = startup_report.to_dict()
+    code = status.HTTP_200_OK if startup_report.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=code, content=report)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return metrics.snapshot()
+
+
 @app.post("/triage", response_model=TriageResponse)
 async def triage_endpoint(payload: TriageRequest):
     description = payload.description.strip()
     if not description:
         raise HTTPException(status_code=400, detail="Description must not be empty.")
 
-    result = await triage_ticket(description)
-    return TriageResponse(**result)
\ No newline at end of file
+    try:
+        result = await admission.submit(description)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": e.reason},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return TriageResponse(**result)
+
+
+# Module fully loaded: reported as the "import" startup phase
+_IMPORT_LOADED = time.perf_counter()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+
+class StartupReport:
+    """
+    Tracks startup phases and their durations against STARTUP_BUDGET_SECONDS.
+    Backs the /readyz endpoint: the service is ready once warm-up has finished.
+    """
+
+    def __init__(self, budget_seconds: float) -> None:
+        self.budget_seconds = budget_seconds
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._origin = time.perf_counter()
+
+    def mark_origin(self, origin: float) -> None:
+        """Count from an earlier point in time (e.g. when app.main started importing)."""
+        self._origin = origin
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = round(seconds, 4)
+
+    async def run_phase(self, phase: str, fn, *args: Any) -> Any:
+        """Run a blocking init step in a worker thread, keeping the event loop free."""
+        started = time.perf_counter()
+        result = await asyncio.to_thread(fn, *args)
+        self.record(phase, time.perf_counter() - started)
+        return result
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.error = error
+        self.ready = error is None
+        self.record("total", time.perf_counter() - self._origin)
+        status = "ready" if self.ready else f"warm-up failed: {error}"
+        print(f"Startup {status} in {self.phases['total']:.3f}s (budget {self.budget_seconds:.1f}s): {self.phases}")
+        if self.phases["total"] > self.budget_seconds:
+            print(f"Warning: startup exceeded its {self.budget_seconds:.1f}s budget.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.phases.get("total")
+        return {
+            "status": "ready" if self.ready else ("failed" if self.error else "warming_up"),
+            "error": self.error,
+            "phases": dict(self.phases),
+            "budget_seconds": self.budget_seconds,
+            "within_budget": None if total is None else total <= self.budget_seconds,
+        }
+
+
+def _ensure_embeddings_index() -> None:
+    from scripts.build_kb_index_embeddings import build_index, KB_EMB_PATH
+
+    if not KB_EMB_PATH.exists():
+        print(f"Embeddings not found at {KB_EMB_PATH}. Generating...")
+        build_index()
+    else:
+        print(f"Embeddings found at {KB_EMB_PATH}.")
+
+
+async def warm_up(report: StartupReport) -> None:
+    """
+    Load everything the first request would otherwise pay for: the KB,
+    the search index for the active mode, and the LLM client.
+    Each step is idempotent; requests arriving meanwhile load lazily themselves.
+    """
+    from agent import tools
+    from agent.offload import retrieval_executor
+
+    try:
+        await report.run_phase("kb", tools.get_kb_entries)
+        await report.run_phase("llm_client", tools.get_llm_client)
+        if settings.MOCK_LLM:
+            index = await report.run_phase("lexical_index", tools.get_lexical_index)
+        else:
+            await report.run_phase("embeddings_file", _ensure_embeddings_index)
+            await report.run_phase("embeddings_client", tools.get_embeddings_client)
+            index, _ = await report.run_phase("vector_index", tools.get_vector_index)
+        if retrieval_executor.mode == "process":
+            # Write the index files worker processes map, so the first search does not
+            await report.run_phase("publish_index", retrieval_executor.prepare, index)
+    except Exception as e:
+        report.finish(error=repr(e))
+        return
+    report.finish()
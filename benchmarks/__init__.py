@@ -0,0 +1,7 @@
+"""
+Benchmark suite for the Support Ticket Triage Agent.
+
+- load:       end-to-end load testing against the HTTP API (in-process or remote)
+- micro:      microbenchmarks and scaling curves for retrieval / classification hot paths
+- compare:    diff two JSON result files to spot regressions between commits
+"""
@@ -0,0 +1,65 @@
+"""
+Compare two benchmark JSON reports (baseline vs candidate).
+
+Works for both load (benchmarks.load) and microbenchmark (benchmarks.micro) reports.
+
+run: python -m benchmarks.compare results/benchmarks/load-abc.json results/benchmarks/load-def.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+LATENCY_KEYS = ["p50", "p95", "p99", "p99.9", "max"]
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_load(base: Dict[str, Any], cand: Dict[str, Any]) -> List[Tuple[str, float, float]]:
+    rows = [
+        ("throughput_rps", base["throughput_rps"], cand["throughput_rps"]),
+        ("goodput_rps", base["goodput_rps"], cand["goodput_rps"]),
+    ]
+    for section in ("latency_all", "latency_success"):
+        for key in LATENCY_KEYS:
+            rows.append((f"{section}.{key}", base[section]["summary"][key], cand[section]["summary"][key]))
+    return rows
+
+
+def compare_micro(base: Dict[str, Any], cand: Dict[str, Any]) -> List[Tuple[str, float, float]]:
+    rows = []
+    base_points = {(p["name"], p["size"]): p for p in base["points"]}
+    for p in cand["points"]:
+        b = base_points.get((p["name"], p["size"]))
+        if b is None or b.get("skipped") or p.get("skipped"):
+            continue
+        rows.append((f"{p['name']}[{p['size']}].median_s", b["median_s"], p["median_s"]))
+        rows.append((f"{p['name']}[{p['size']}].peak_mem_kb", b["peak_mem_kb"], p["peak_mem_kb"]))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Flag changes larger than this many percent")
+    args = parser.parse_args()
+
+    base, cand = _load(args.baseline), _load(args.candidate)
+    # Microbenchmark reports carry "points", load reports carry latency histograms
+    rows = compare_micro(base, cand) if "points" in base else compare_load(base, cand)
+
+    print(f"baseline:  {base.get('git_revision')}  candidate: {cand.get('git_revision')}")
+    for name, b, c in rows:
+        delta = ((c - b) / b * 100.0) if b else 0.0
+        flag = "  <--" if abs(delta) >= args.threshold else ""
+        print(f"{name:45s} {b:12.5f} -> {c:12.5f}  ({delta:+6.1f}%){flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+KB_PATH = PROJECT_ROOT / "kb" / "kb.json"
+
+# Must match TriageRequest.description max_length
+MAX_DESCRIPTION_CHARS = 4000
+
+# Named length distributions: (weight, min_chars, max_chars) buckets.
+LENGTH_PROFILES: Dict[str, List[tuple]] = {
+    "short": [(1.0, 20, 160)],
+    "long": [(1.0, 1500, MAX_DESCRIPTION_CHARS)],
+    # Roughly what a support inbox looks like: mostly one-liners,
+    # some paragraphs, a tail of pasted logs / stack traces.
+    "mixed": [(0.6, 20, 200), (0.3, 200, 1200), (0.1, 1200, MAX_DESCRIPTION_CHARS)],
+}
+
+_OPENERS = [
+    "Hi team,",
+    "Hello,",
+    "",
+    "Urgent:",
+    "Not sure if this is the right place, but",
+]
+
+_FILLER = [
+    "This started happening this morning.",
+    "I already tried clearing my cache and logging out.",
+    "It happens on both Chrome and Firefox.",
+    "Several people on my team see the same thing.",
+    "Please advise, this is blocking our work.",
+    "It was working fine last week.",
+    "Steps: open the app, go to settings, click save.",
+]
+
+_LOG_LINES = [
+    "2025-11-19T10:21:33Z ERROR request failed status=500 path=/api/checkout",
+    "2025-11-19T10:21:34Z WARN retrying request attempt=2",
+    '  File "/srv/app/handlers.py", line 88, in handle_request',
+    '  File "/srv/app/payments.py", line 212, in charge',
+    "TimeoutError: upstream did not respond within 30s",
+]
+
+
+def load_corpus(path: Path) -> List[str]:
+    """
+    Load ticket descriptions from a file.
+    Supports a JSON list (of strings or {"description": ...} objects)
+    or JSONL with one such item per line.
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        items = json.loads(text)
+    return [i["description"] if isinstance(i, dict) else str(i) for i in items]
+
+
+def seed_corpus_from_kb() -> List[str]:
+    """
+    Build base ticket texts from the KB titles and symptoms,
+    so a realistic share of traffic hits known issues.
+    """
+    with KB_PATH.open("r", encoding="utf-8") as f:
+        kb = json.load(f)
+    seeds = []
+    for entry in kb:
+        symptoms = ", ".join(entry.get("symptoms", []))
+        seeds.append(f"{entry['title']}. I am seeing {symptoms}.")
+    seeds.extend([
+        "How do I invite team members to my workspace?",
+        "The app switches from dark mode to light mode randomly after a few minutes.",
+        "I think there is a security breach in my account, I noticed unauthorized transactions.",
+        "Export to CSV produces an empty file.",
+    ])
+    return seeds
+
+
+class TicketGenerator:
+    """
+    Produces an endless stream of ticket descriptions with:
+    - a target duplicate ratio (exact repeats of previously sent tickets,
+      which is what form double-submits and retrying integrations produce)
+    - a length distribution, padding base texts with filler and log dumps
+      (a base text is never cut, so base texts longer than the target win)
+    """
+
+    def __init__(
+        self,
+        base: List[str],
+        duplicate_ratio: float = 0.0,
+        length_profile: str = "mixed",
+        seed: Optional[int] = None,
+    ) -> None:
+        if not base:
+            raise ValueError("Ticket corpus is empty.")
+        if length_profile not in LENGTH_PROFILES:
+            raise ValueError(f"Unknown length profile: {length_profile}")
+        self.base = base
+        self.duplicate_ratio = duplicate_ratio
+        self.buckets = LENGTH_PROFILES[length_profile]
+        self.rng = random.Random(seed)
+        self._sent: List[str] = []
+
+    def _target_length(self) -> int:
+        weights = [b[0] for b in self.buckets]
+        _, lo, hi = self.rng.choices(self.buckets, weights=weights)[0]
+        return self.rng.randint(lo, hi)
+
+    def _fresh(self) -> str:
+        target = min(self._target_length(), MAX_DESCRIPTION_CHARS)
+        # Make texts unique so that only deliberate duplicates collide
+        suffix = f" (ref #{self.rng.randint(0, 10**9)})"
+        body_length = target - len(suffix)
+        # The base ticket is kept whole (its keywords drive classification and
+        # KB matching), so its length is the floor; the opener is added if it fits.
+        base = self.rng.choice(self.base)[: MAX_DESCRIPTION_CHARS - len(suffix)]
+        opener = self.rng.choice(_OPENERS)
+        core = f"{opener} {base}" if opener and len(opener) + 1 + len(base) <= body_length else base
+        padding = ""
+        while len(core) + len(padding) < body_length:
+            if target > 1000 and self.rng.random() < 0.5:
+                padding += "\n" + self.rng.choice(_LOG_LINES)
+            else:
+                padding += " " + self.rng.choice(_FILLER)
+        # Only the filler is trimmed to land on the target length
+        return core + padding[: max(body_length - len(core), 0)] + suffix
+
+    def next(self) -> str:
+        if self._sent and self.rng.random() < self.duplicate_ratio:
+            return self.rng.choice(self._sent)
+        text = self._fresh()
+        self._sent.append(text)
+        return text
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            yield self.next()
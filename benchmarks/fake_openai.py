@@ -0,0 +1,148 @@
+"""
+Minimal local stand-in for the OpenAI API, with injectable latency.
+
+Serves the two endpoints the agent uses:
+- POST /v1/chat/completions  -> JSON classification built by LLMClientMock rules
+- POST /v1/embeddings        -> deterministic pseudo-random unit vectors
+
+run standalone: python -m benchmarks.fake_openai --port 8001 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+
+from agent.llm_client import LLMClientMock
+
+EMBEDDING_DIM = 1536
+
+class LatencyModel:
+    """
+    Latency injected per request: a base value plus uniform jitter,
+    with an optional rare slow tail to mimic provider hiccups.
+    """
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0,
+                 tail_prob: float = 0.0, tail_ms: float = 0.0, seed: Optional[int] = None) -> None:
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        ms = self.base_ms + self.rng.uniform(0, self.jitter_ms)
+        if self.tail_prob and self.rng.random() < self.tail_prob:
+            ms += self.tail_ms
+        return ms / 1000.0
+
+
+def _extract_ticket(messages: list) -> str:
+    # agent.prompt.build_messages sends the (compacted) ticket text as the user message
+    return next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+
+def _fake_embedding(text: str) -> list:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vec = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM)
+    return (vec / np.linalg.norm(vec)).tolist()
+
+
+def create_app(latency: LatencyModel) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    mock = LLMClientMock()
+    app.state.calls = {"chat": 0, "embeddings": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        await asyncio.sleep(latency.sample())
+        result = await mock._mock_classify(_extract_ticket(body.get("messages", [])))
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(result)},
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.calls["embeddings"] += 1
+        await asyncio.sleep(latency.sample())
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        return {
+            "object": "list",
+            "model": body.get("model", "fake"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _fake_embedding(t)}
+                for i, t in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+class FakeOpenAIServer:
+    """
+    Runs the fake API with uvicorn in a background thread.
+    Usage:
+        with FakeOpenAIServer(LatencyModel(base_ms=200)) as server:
+            os.environ["OPENAI_BASE_URL"] = server.base_url
+    """
+
+    def __init__(self, latency: LatencyModel, host: str = "127.0.0.1", port: int = 8001) -> None:
+        import uvicorn
+
+        self.app = create_app(latency)
+        config = uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.base_url = f"http://{host}:{port}/v1"
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Fake OpenAI server did not start in time.")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI API with injectable latency")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter added on top")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="Probability of a slow-tail call")
+    parser.add_argument("--tail-ms", type=float, default=0.0, help="Extra latency for slow-tail calls")
+    args = parser.parse_args()
+
+    model = LatencyModel(args.latency_ms, args.jitter_ms, args.tail_prob, args.tail_ms)
+    uvicorn.run(create_app(model), host=args.host, port=args.port)
@@ -0,0 +1,79 @@
+import math
+from typing import Dict, Sequence
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram.
+    Values are recorded in microseconds into log-spaced buckets so that every
+    bucket has a bounded relative error (1% by default), independent of the
+    magnitude of the value. Memory stays constant no matter how many samples
+    are recorded, so it is safe for long open-loop runs.
+    """
+
+    def __init__(self, relative_error: float = 0.01) -> None:
+        self.relative_error = relative_error
+        self._log_base = math.log1p(relative_error)
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min_us = math.inf
+        self.max_us = 0.0
+        self.sum_us = 0.0
+
+    def _bucket(self, value_us: float) -> int:
+        return int(math.log(max(value_us, 1.0)) / self._log_base)
+
+    def _bucket_upper(self, bucket: int) -> float:
+        return math.exp((bucket + 1) * self._log_base)
+
+    def record(self, seconds: float) -> None:
+        value_us = seconds * 1_000_000
+        b = self._bucket(value_us)
+        self.counts[b] = self.counts.get(b, 0) + 1
+        self.total += 1
+        self.sum_us += value_us
+        self.min_us = min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, p: float) -> float:
+        """
+        Return the value (in seconds) at percentile p (0-100).
+        Reports the upper edge of the bucket, clamped to the observed max.
+        """
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(self.total * p / 100.0))
+        seen = 0
+        for b in sorted(self.counts):
+            seen += self.counts[b]
+            if seen >= target:
+                return min(self._bucket_upper(b), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def mean(self) -> float:
+        return (self.sum_us / self.total) / 1_000_000 if self.total else 0.0
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 95, 99, 99.9)) -> Dict[str, float]:
+        out = {
+            "count": self.total,
+            "min": (self.min_us / 1_000_000) if self.total else 0.0,
+            "mean": self.mean(),
+            "max": self.max_us / 1_000_000,
+        }
+        for p in percentiles:
+            out[f"p{p:g}"] = self.percentile(p)
+        return out
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        Serializable form: summary plus the raw bucket counts, so two runs can
+        be merged or re-analysed later.
+        """
+        return {
+            "relative_error": self.relative_error,
+            "summary": self.summary(),
+            "buckets": [
+                {"upper_s": self._bucket_upper(b) / 1_000_000, "count": c}
+                for b, c in sorted(self.counts.items())
+            ],
+        }
@@ -0,0 +1,264 @@
+"""
+End-to-end load test for /triage.
+
+Examples:
+    # closed loop against a running server (what benchmark.py used to do)
+    python -m benchmarks.load --url http://127.0.0.1:8000/triage --users 10 --requests 50
+
+    # open-loop Poisson arrivals against the app in-process, real-mode code path
+    # backed by a local fake OpenAI server with 300ms +-100ms latency
+    python -m benchmarks.load --in-process --fake-openai --fake-latency-ms 300 \
+        --fake-jitter-ms 100 --arrival poisson --rate 20 --requests 500 \
+        --duplicate-ratio 0.2 --length-profile mixed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from agent.heuristics import keyword_severity
+from benchmarks.corpus import LENGTH_PROFILES, TicketGenerator, load_corpus, seed_corpus_from_kb
+from benchmarks.histogram import LatencyHistogram
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_URL = "http://127.0.0.1:8000/triage"
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "results" / "benchmarks"
+
+
+class LoadResults:
+    """
+    Collects per-request outcomes. Latency is measured from the *scheduled*
+    send time, so open-loop runs are not affected by coordinated omission.
+    """
+
+    def __init__(self) -> None:
+        self.all = LatencyHistogram()
+        self.success = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        # Keyed by the keyword severity the admission queue will assign
+        self.by_severity: Dict[str, LatencyHistogram] = {}
+        self.statuses_by_severity: Dict[str, Counter] = {}
+        self.duplicates_sent = 0
+
+    def record(self, status: Any, latency: float, severity: Optional[str] = None) -> None:
+        self.statuses[str(status)] += 1
+        self.all.record(latency)
+        if status == 200:
+            self.success.record(latency)
+        if severity is not None:
+            self.statuses_by_severity.setdefault(severity, Counter())[str(status)] += 1
+            if status == 200:
+                self.by_severity.setdefault(severity, LatencyHistogram()).record(latency)
+
+
+async def _send(client: httpx.AsyncClient, url: str, description: str,
+                scheduled: float, results: LoadResults) -> None:
+    try:
+        resp = await client.post(url, json={"description": description})
+        status: Any = resp.status_code
+    except Exception as e:
+        status = f"error:{type(e).__name__}"
+    results.record(status, time.perf_counter() - scheduled, keyword_severity(description.lower()))
+
+
+async def run_closed_loop(clients: List[httpx.AsyncClient], url: str, tickets: TicketGenerator,
+                          users: int, total: int, results: LoadResults) -> None:
+    """
+    `users` virtual users, each sending its next request as soon as the previous one returns.
+    """
+    remaining = iter(range(total))
+
+    async def user(idx: int) -> None:
+        for i in remaining:
+            # Rotate simulated client IPs per request, as with the open loop
+            client = clients[i % len(clients)]
+            await _send(client, url, tickets.next(), time.perf_counter(), results)
+
+    await asyncio.gather(*(user(i) for i in range(users)))
+
+
+async def run_open_loop(clients: List[httpx.AsyncClient], url: str, tickets: TicketGenerator,
+                        rate: float, total: int, results: LoadResults, seed: Optional[int]) -> None:
+    """
+    Poisson arrivals at `rate` req/s, independent of how fast the server responds.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    next_at = start
+    tasks = []
+    for i in range(total):
+        next_at += rng.expovariate(rate)
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        client = clients[i % len(clients)]
+        tasks.append(asyncio.create_task(_send(client, url, tickets.next(), next_at, results)))
+    await asyncio.gather(*tasks)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+async def _open_clients(stack: AsyncExitStack, args: argparse.Namespace) -> List[httpx.AsyncClient]:
+    timeout = httpx.Timeout(args.timeout)
+    if not args.in_process:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        return [await stack.enter_async_context(httpx.AsyncClient(timeout=timeout, limits=limits))]
+
+    # Import lazily: env vars (fake OpenAI URL, MOCK_LLM) must be set first
+    from app.main import app
+
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    clients = []
+    for i in range(args.clients):
+        # One transport per simulated client IP, so the per-IP rate limiter sees distinct users
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=(f"10.0.{i // 256}.{i % 256}", 50000))
+        clients.append(await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout)
+        ))
+    return clients
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    base = load_corpus(Path(args.corpus)) if args.corpus else seed_corpus_from_kb()
+    tickets = TicketGenerator(base, args.duplicate_ratio, args.length_profile, args.seed)
+    results = LoadResults()
+    url = "/triage" if args.in_process else args.url
+
+    async with AsyncExitStack() as stack:
+        fake = None
+        if args.fake_openai:
+            # Settings are read from the environment on first import of app.config,
+            # which fake_openai (via agent.llm_client) triggers: set them first.
+            os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/v1"
+            os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+            os.environ["MOCK_LLM"] = "false"
+            from benchmarks.fake_openai import FakeOpenAIServer, LatencyModel
+
+            latency = LatencyModel(args.fake_latency_ms, args.fake_jitter_ms,
+                                   args.fake_tail_prob, args.fake_tail_ms, args.seed)
+            fake = stack.enter_context(FakeOpenAIServer(latency, port=args.fake_port))
+
+        clients = await _open_clients(stack, args)
+
+        print(f"Starting {args.arrival}-loop benchmark against {'in-process app' if args.in_process else url}")
+        start = time.perf_counter()
+        if args.arrival == "closed":
+            await run_closed_loop(clients, url, tickets, args.users, args.requests, results)
+        else:
+            await run_open_loop(clients, url, tickets, args.rate, args.requests, results, args.seed)
+        elapsed = time.perf_counter() - start
+        upstream_calls = dict(fake.app.state.calls) if fake else None
+
+    sent = len(tickets._sent)
+    ok = results.statuses.get("200", 0)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "elapsed_s": elapsed,
+        "requests": results.all.total,
+        "unique_tickets": sent,
+        "duplicate_tickets": results.all.total - sent,
+        "throughput_rps": results.all.total / elapsed if elapsed else 0.0,
+        "goodput_rps": ok / elapsed if elapsed else 0.0,
+        "statuses": dict(results.statuses),
+        "latency_all": results.all.to_dict(),
+        "latency_success": results.success.to_dict(),
+        "latency_success_by_severity": {k: h.to_dict() for k, h in sorted(results.by_severity.items())},
+        "statuses_by_severity": {k: dict(c) for k, c in sorted(results.statuses_by_severity.items())},
+        "upstream_calls": upstream_calls,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n--- Results ---")
+    print(f"Total Time Taken: {report['elapsed_s']:.2f} seconds")
+    print(f"Requests: {report['requests']} ({report['duplicate_tickets']} duplicates)")
+    print(f"Throughput: {report['throughput_rps']:.2f} req/s (goodput {report['goodput_rps']:.2f} req/s)")
+    print(f"Statuses: {report['statuses']}")
+    for name in ("latency_all", "latency_success"):
+        s = report[name]["summary"]
+        print(
+            f"{name}: n={s['count']} mean={s['mean']:.4f}s p50={s['p50']:.4f}s p95={s['p95']:.4f}s "
+            f"p99={s['p99']:.4f}s p99.9={s['p99.9']:.4f}s max={s['max']:.4f}s"
+        )
+    for severity, hist in report.get("latency_success_by_severity", {}).items():
+        s = hist["summary"]
+        statuses = report["statuses_by_severity"].get(severity, {})
+        print(f"  {severity}: n={s['count']} p50={s['p50']:.4f}s p99={s['p99']:.4f}s statuses={statuses}")
+    if report["upstream_calls"] is not None:
+        print(f"Upstream (fake OpenAI) calls: {report['upstream_calls']}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark Support Ticket Agent")
+    target = parser.add_argument_group("target")
+    target.add_argument("--url", default=DEFAULT_URL, help="Target URL (ignored with --in-process)")
+    target.add_argument("--in-process", action="store_true", help="Drive app.main:app through ASGI, no network")
+    target.add_argument("--clients", type=int, default=1,
+                        help="Distinct simulated client IPs (in-process only), to model the per-IP rate limiter")
+    target.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--arrival", choices=["closed", "poisson"], default="closed")
+    load.add_argument("--users", type=int, default=10, help="Concurrent users (closed loop)")
+    load.add_argument("--rate", type=float, default=10.0, help="Mean arrival rate in req/s (poisson)")
+    load.add_argument("--requests", type=int, default=50, help="Total number of requests to send")
+
+    corpus = parser.add_argument_group("corpus")
+    corpus.add_argument("--corpus", help="JSON/JSONL file of ticket descriptions (default: seeded from kb.json)")
+    corpus.add_argument("--duplicate-ratio", type=float, default=0.0, help="Share of requests repeating an earlier ticket")
+    corpus.add_argument("--length-profile", choices=sorted(LENGTH_PROFILES), default="mixed")
+    corpus.add_argument("--seed", type=int, default=None)
+
+    fake = parser.add_argument_group("fake OpenAI")
+    fake.add_argument("--fake-openai", action="store_true", help="Start a local fake OpenAI server and use real mode")
+    fake.add_argument("--fake-port", type=int, default=8001)
+    fake.add_argument("--fake-latency-ms", type=float, default=0.0)
+    fake.add_argument("--fake-jitter-ms", type=float, default=0.0)
+    fake.add_argument("--fake-tail-prob", type=float, default=0.0)
+    fake.add_argument("--fake-tail-ms", type=float, default=0.0)
+
+    parser.add_argument("--output", help="Where to write the JSON report (default: results/benchmarks/)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.fake_openai and not args.in_process:
+        print("Note: --fake-openai only affects the in-process app; point your server's OPENAI_BASE_URL at it instead.")
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = DEFAULT_OUTPUT_DIR / f"load-{report['git_revision'] or 'unknown'}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
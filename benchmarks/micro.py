@@ -0,0 +1,328 @@
+"""
+Microbenchmarks for the retrieval and classification hot paths, below the HTTP layer.
+
+Each benchmark is run over a growing input axis (KB size, description length,
+embedding dimension) to produce a scaling curve. For every point we report the
+median / p95 time per call and the peak Python-heap allocation (tracemalloc,
+which also tracks NumPy buffers). A log-log slope is fitted over the curve so
+that an accidental O(n^2) shows up as an exponent of ~2.
+
+run:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --sizes 100,1000,10000,100000,1000000 --only search_kb_mock
+    python -m benchmarks.micro --plot     # also writes a PNG (needs matplotlib)
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from agent.kb_index import PartitionedIndex, VectorIndex
+from benchmarks.corpus import MAX_DESCRIPTION_CHARS
+from benchmarks.load import DEFAULT_OUTPUT_DIR, _git_revision
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+DEFAULT_LENGTHS = [50, 250, 1000, 2000, MAX_DESCRIPTION_CHARS]
+DEFAULT_DIMS = [256, 512, 1536, 3072]
+
+_CATEGORIES = ["Bug", "Login", "Billing", "Performance", "Email", "Question/How-To", "Other"]
+_WORDS = (
+    "login password checkout payment invoice error crash slow dashboard mobile android ios "
+    "timeout export csv email verification signup refund charge account settings profile "
+    "upload file sync notification api token webhook report search filter team invite "
+    "admin permission sso saml billing plan upgrade cancel delete restore backup database"
+).split()
+
+
+def make_kb(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        entries.append({
+            "id": f"SYN-{i}",
+            "title": " ".join(rng.choices(_WORDS, k=rng.randint(3, 7))),
+            "category": rng.choice(_CATEGORIES),
+            "symptoms": [" ".join(rng.choices(_WORDS, k=rng.randint(1, 3))) for _ in range(4)],
+            "recommended_action": "Synthetic entry.",
+        })
+    return entries
+
+
+def make_embedding_matrix(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Synthetic KB embeddings as one float32 matrix (4 bytes per value; Python
+    float lists like kb_index_embeddings.json would take ~8x that).
+    """
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim), dtype=np.float32)
+
+
+def make_description(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    text = "Checkout keeps failing with error 500 on mobile when I try to pay."
+    while len(text) < length:
+        text += " " + " ".join(rng.choices(_WORDS, k=8)) + "."
+    return text[:length]
+
+
+@contextmanager
+def patched(module: Any, **attrs: Any) -> Iterator[None]:
+    old = {k: getattr(module, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(module, k, v)
+    try:
+        yield
+    finally:
+        for k, v in old.items():
+            setattr(module, k, v)
+
+
+def measure(fn: Callable[[], Any], min_time: float, max_repeats: int) -> Dict[str, float]:
+    """
+    Time fn() repeatedly (at least 3 times, until min_time has elapsed), then run it
+    once more under tracemalloc for the peak allocation.
+    """
+    fn()  # warm-up
+    times: List[float] = []
+    started = time.perf_counter()
+    while len(times) < 3 or (time.perf_counter() - started < min_time and len(times) < max_repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "repeats": len(times),
+        "median_s": statistics.median(times),
+        "min_s": times[0],
+        "p95_s": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "peak_mem_kb": peak / 1024,
+    }
+
+
+def fit_exponent(points: List[Dict[str, Any]]) -> Optional[float]:
+    """Least-squares slope of log(time) vs log(size)."""
+    pts = [(math.log(p["size"]), math.log(p["median_s"])) for p in points
+           if not p.get("skipped") and p["median_s"] > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    var = sum((x - mx) ** 2 for x, _ in pts)
+    if not var:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pts) / var
+
+
+class Suite:
+    def __init__(self, args: argparse.Namespace) -> None:
+        import agent.tools as tools
+        from agent.llm_client import LLMClientMock
+
+        self.tools = tools
+        self.mock = LLMClientMock()
+        self.args = args
+        self.loop = asyncio.new_event_loop()
+        self.points: List[Dict[str, Any]] = []
+
+    def run_series(self, name: str, axis: str, sizes: List[int],
+                   make_fn: Callable[[int], Callable[[], Any]]) -> None:
+        if self.args.only and name not in self.args.only:
+            return
+        over_budget = False
+        for size in sizes:
+            point: Dict[str, Any] = {"name": name, "axis": axis, "size": size}
+            if over_budget:
+                # Previous size already exceeded the per-call budget; larger ones would only be slower
+                point["skipped"] = True
+                self.points.append(point)
+                print(f"{name:24s} {axis}={size:<9d} skipped (over budget)")
+                continue
+            fn = make_fn(size)
+            point.update(measure(fn, self.args.min_time, self.args.max_repeats))
+            # Free this size's KB / index before the next, larger one is built
+            del fn
+            self._release()
+            self.points.append(point)
+            print(
+                f"{name:24s} {axis}={size:<9d} median={point['median_s'] * 1e3:10.4f}ms "
+                f"p95={point['p95_s'] * 1e3:10.4f}ms peak={point['peak_mem_kb']:10.1f}KiB"
+            )
+            over_budget = point["median_s"] > self.args.max_call_seconds
+
+    def _release(self) -> None:
+        self.tools._lexical_cache = (None, None)
+        self.tools._vector_cache = (None, None, None)
+        gc.collect()
+
+    def _run(self, coro_fn: Callable[[], Any]) -> Callable[[], Any]:
+        return lambda: self.loop.run_until_complete(coro_fn())
+
+    def run(self) -> None:
+        tools, args = self.tools, self.args
+        query = make_description(args.query_length, seed=1)
+
+        self.run_series("tokenize", "chars", args.lengths,
+                        lambda n: (lambda d=make_description(n): tools._tokenize(d)))
+
+        self.run_series("mock_classify", "chars", args.lengths,
+                        lambda n: self._run(lambda d=make_description(n): self.mock._mock_classify(d)))
+
+        def search_mock(n: int) -> Callable[[], Any]:
+            kb = make_kb(n)
+
+            async def call():
+                with patched(tools, KB_ENTRIES=kb):
+                    return await tools.search_kb_mock(query, top_n=3)
+            return self._run(call)
+
+        self.run_series("search_kb_mock", "kb_size", args.sizes, search_mock)
+
+        def search_mock_filtered(n: int) -> Callable[[], Any]:
+            kb = make_kb(n)
+
+            async def call():
+                with patched(tools, KB_ENTRIES=kb):
+                    # One category partition out of len(_CATEGORIES)
+                    return await tools.search_kb_mock(query, top_n=3, categories={"Bug"})
+            return self._run(call)
+
+        self.run_series("search_kb_mock_filtered", "kb_size", args.sizes, search_mock_filtered)
+
+        def cosine(dim: int) -> Callable[[], Any]:
+            rng = np.random.default_rng(0)
+            a, b = rng.standard_normal(dim), rng.standard_normal(dim)
+            return lambda: tools.cosine(a, b)
+
+        self.run_series("cosine", "dim", args.dims, cosine)
+
+        def search_embeddings(n: int) -> Callable[[], Any]:
+            kb = make_kb(n)
+            matrix = make_embedding_matrix(n, args.dim)
+            # Normalize in place and hand tools a prebuilt index, instead of
+            # going through kb_index_embeddings-style lists of floats
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            index = PartitionedIndex(VectorIndex(matrix), kb)
+            q_emb = np.random.default_rng(1).standard_normal(args.dim, dtype=np.float32)
+
+            async def stub_embed_query(_query: str) -> Any:
+                return q_emb
+
+            async def call():
+                # KB_EMB_INDEX only has to match the cache key, get_vector_index never reads it
+                with patched(tools, KB_ENTRIES=kb, KB_EMB_INDEX=matrix, embed_query=stub_embed_query,
+                             _vector_cache=(kb, matrix, (index, kb))):
+                    return await tools.search_kb_embeddings(query, top_n=3)
+            return self._run(call)
+
+        self.run_series("search_kb_embeddings", "kb_size", args.sizes, search_embeddings)
+
+        def decide(n: int) -> Callable[[], Any]:
+            meta = {"summary": query[:120], "category": "Bug", "severity": "High"}
+            matches = [dict(e, match_score=0.4) for e in make_kb(n)]
+            return lambda: tools.decide_next_action(meta, matches)
+
+        self.run_series("decide_next_action", "matches", [1, 3, 10, 100], decide)
+
+    def report(self) -> Dict[str, Any]:
+        curves = {}
+        for name in dict.fromkeys(p["name"] for p in self.points):
+            pts = [p for p in self.points if p["name"] == name]
+            curves[name] = {"axis": pts[0]["axis"], "exponent": fit_exponent(pts)}
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "config": {k: v for k, v in vars(self.args).items() if k not in ("output", "plot")},
+            "curves": curves,
+            "points": self.points,
+        }
+
+
+def plot(report: Dict[str, Any], output: Path) -> None:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed, skipping plot.")
+        return
+
+    names = list(report["curves"])
+    fig, axes = plt.subplots(1, len(names), figsize=(4 * len(names), 3.5), squeeze=False)
+    for ax, name in zip(axes[0], names):
+        pts = [p for p in report["points"] if p["name"] == name and not p.get("skipped")]
+        ax.loglog([p["size"] for p in pts], [p["median_s"] for p in pts], marker="o")
+        exp = report["curves"][name]["exponent"]
+        ax.set_title(f"{name}\nslope={exp:.2f}" if exp is not None else name, fontsize=9)
+        ax.set_xlabel(report["curves"][name]["axis"])
+        ax.set_ylabel("median s/call")
+    fig.tight_layout()
+    fig.savefig(output)
+    print(f"Saved: {output}")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for retrieval and classification")
+    parser.add_argument("--sizes", type=_int_list, default=DEFAULT_SIZES, help="Synthetic KB sizes")
+    parser.add_argument("--lengths", type=_int_list, default=DEFAULT_LENGTHS, help="Description lengths (chars)")
+    parser.add_argument("--dims", type=_int_list, default=DEFAULT_DIMS, help="Embedding dims for cosine")
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dim for the synthetic KB index")
+    parser.add_argument("--query-length", type=int, default=500, help="Query length used for KB searches")
+    parser.add_argument("--only", type=lambda s: s.split(","), default=None, help="Comma-separated benchmark names")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds spent timing each point")
+    parser.add_argument("--max-repeats", type=int, default=1000)
+    parser.add_argument("--max-call-seconds", type=float, default=2.0,
+                        help="Stop growing a series once a single call is slower than this")
+    parser.add_argument("--output", help="Where to write the JSON report (default: results/benchmarks/)")
+    parser.add_argument("--plot", action="store_true", help="Also write a PNG of the scaling curves")
+    args = parser.parse_args(argv)
+
+    suite = Suite(args)
+    suite.run()
+    report = suite.report()
+
+    print("\n--- Scaling (log-log slope; ~1 linear, ~2 quadratic) ---")
+    for name, curve in report["curves"].items():
+        exp = curve["exponent"]
+        print(f"{name:24s} vs {curve['axis']:8s} {'n/a' if exp is None else f'{exp:.2f}'}")
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = DEFAULT_OUTPUT_DIR / f"micro-{report['git_revision'] or 'unknown'}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved: {output}")
+
+    if args.plot:
+        plot(report, output.with_suffix(".png"))
+
+
+if __name__ == "__main__":
+    main()
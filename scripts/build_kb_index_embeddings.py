@@ -5,12 +5,10 @@ python -m scripts.build_kb_index_embeddings
 
 import json
 from pathlib import Path
-from openai import OpenAI
-from dotenv import load_dotenv
-from tqdm import tqdm
 
-load_dotenv()
-client = OpenAI()
+# The OpenAI client is created on first use: importing this module
+# (e.g. for KB_EMB_PATH) must not need an API key.
+client = None
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 KB_PATH = PROJECT_ROOT / "kb" / "kb.json"
@@ -22,10 +20,20 @@ def load_kb():
     with KB_PATH.open("r", encoding="utf-8") as f:
         return json.load(f)
 
+def get_client():
+    global client
+    if client is None:
+        from openai import OpenAI
+
+        client = OpenAI()
+    return client
+
 def embed(text: str):
-    return client.embeddings.create(model=MODEL, input=text).data[0].embedding
+    return get_client().embeddings.create(model=MODEL, input=text).data[0].embedding
 
 def build_index():
+    from tqdm import tqdm
+
     kb_entries = load_kb()
     index = []
 
@@ -44,4 +52,7 @@ def build_index():
     print(f"Saved: {KB_EMB_PATH}")
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
     build_index()
@@ -0,0 +1,66 @@
+"""
+Mine the triage log for recurring tickets that did not match the KB.
+These are candidates for new kb/kb.json entries.
+
+python -m scripts.query_triage_log
+python -m scripts.query_triage_log --days 7 --min-count 3 --limit 50
+python -m scripts.query_triage_log --cluster 0.9     # group near-duplicates by embedding (real mode only)
+python -m scripts.query_triage_log --json > unmatched.json
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from agent.result_store import cluster_unmatched, frequent_unmatched
+from app.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Frequent unmatched tickets from the triage log")
+    parser.add_argument("--db", default=settings.TRIAGE_LOG_PATH, help="Path to the triage log database")
+    parser.add_argument("--days", type=float, default=None, help="Only look at the last N days")
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--cluster", type=float, default=None, metavar="SIMILARITY",
+                        help="Group by embedding cosine similarity >= SIMILARITY instead of exact text")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    db = Path(args.db)
+    if not db.exists():
+        raise SystemExit(f"No triage log at {db}")
+
+    since = time.time() - args.days * 86400 if args.days else None
+    # Read-only: safe to run next to a live server thanks to WAL mode
+    conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    try:
+        if args.cluster is not None:
+            rows = cluster_unmatched(conn, args.cluster, args.min_count, since, args.limit)
+        else:
+            rows = frequent_unmatched(conn, args.min_count, since, args.limit)
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    if not rows:
+        print("No recurring unmatched tickets.")
+        return
+    for row in rows:
+        if "last_seen" in row:
+            last_seen = datetime.fromtimestamp(row["last_seen"]).strftime("%Y-%m-%d %H:%M")
+            detail = f"{row['category']}/{row['severity']}, best KB score {row['best_score']}, last seen {last_seen}"
+        else:
+            detail = f"{row['severity']}, categories {row['categories']}"
+        print(f"{row['count']:5d}x  {row['description'][:100]}")
+        print(f"        {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+run: python -m pytest
+"""
+
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+
+CRITICAL = "Production is down for everyone"
+HIGH = "The app crashes on launch"
+LOW = "Please update my profile picture"
+
+
+def test_critical_tickets_are_served_before_queued_low_ones():
+    async def scenario():
+        order = []
+        gate = asyncio.Event()
+
+        async def handler(description):
+            await gate.wait()
+            order.append(description)
+            return description
+
+        ctrl = AdmissionController(handler, workers=1, max_queue=10, target=10, interval=10)
+        ctrl.start()
+        # The first ticket occupies the only worker; the rest queue up
+        first = asyncio.create_task(ctrl.submit("first " + LOW))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(ctrl.submit(LOW))
+        critical = asyncio.create_task(ctrl.submit(CRITICAL))
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(first, low, critical)
+        await ctrl.stop()
+        return order
+
+    assert asyncio.run(scenario()) == ["first " + LOW, CRITICAL, LOW]
+
+
+def test_full_queue_evicts_lower_priority_or_rejects():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(description):
+            await gate.wait()
+            return description
+
+        ctrl = AdmissionController(handler, workers=1, max_queue=1, target=10, interval=10)
+        ctrl.start()
+        busy = asyncio.create_task(ctrl.submit(HIGH))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(ctrl.submit(LOW))
+        await asyncio.sleep(0)
+
+        # Queue is full of Low: Critical takes its place
+        critical = asyncio.create_task(ctrl.submit(CRITICAL))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            await low
+
+        # Queue is now full of Critical: High is rejected
+        with pytest.raises(AdmissionRejected) as rejected:
+            await ctrl.submit(HIGH)
+
+        gate.set()
+        await asyncio.gather(busy, critical)
+        await ctrl.stop()
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.retry_after >= 1
+
+
+def test_disconnected_caller_frees_its_queue_slot():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(description):
+            await gate.wait()
+            return description
+
+        ctrl = AdmissionController(handler, workers=1, max_queue=1, target=10, interval=10)
+        ctrl.start()
+        busy = asyncio.create_task(ctrl.submit(HIGH))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(ctrl.submit(LOW))
+        await asyncio.sleep(0)
+        low.cancel()  # client disconnected while queued
+        await asyncio.sleep(0)
+        queued_after_cancel = len(ctrl._heap)
+
+        # Must not trip over the abandoned job, nor be rejected because of it
+        critical = asyncio.create_task(ctrl.submit(CRITICAL))
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(busy, critical)
+        await ctrl.stop()
+        return queued_after_cancel, results
+
+    queued_after_cancel, results = asyncio.run(scenario())
+    assert queued_after_cancel == 0
+    assert results == [HIGH, CRITICAL]
+
+
+def test_sustained_queue_delay_sheds_low_but_serves_critical():
+    async def scenario():
+        async def handler(description):
+            await asyncio.sleep(0.02)
+            return description
+
+        ctrl = AdmissionController(handler, workers=1, max_queue=100, target=0.005, interval=0.03)
+        ctrl.start()
+        tasks = [asyncio.create_task(ctrl.submit(LOW if i % 2 else CRITICAL)) for i in range(12)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        shed_level = ctrl.shed_level
+        await ctrl.stop()
+        return results, shed_level
+
+    results, shed_level = asyncio.run(scenario())
+    critical = results[0::2]
+    low = results[1::2]
+    assert shed_level >= 1
+    assert all(r == CRITICAL for r in critical)
+    assert any(isinstance(r, AdmissionRejected) and r.retry_after >= 1 for r in low)
+
+
+def test_submit_runs_directly_when_not_started():
+    async def handler(description):
+        return description.upper()
+
+    ctrl = AdmissionController(handler)
+    assert asyncio.run(ctrl.submit("hello")) == "HELLO"
@@ -0,0 +1,55 @@
+"""
+run: python -m pytest
+"""
+
+from benchmarks.corpus import (
+    LENGTH_PROFILES,
+    MAX_DESCRIPTION_CHARS,
+    TicketGenerator,
+    seed_corpus_from_kb,
+)
+from benchmarks.histogram import LatencyHistogram
+from benchmarks.micro import fit_exponent
+
+
+def test_histogram_percentiles_within_relative_error():
+    hist = LatencyHistogram(relative_error=0.01)
+    for ms in range(1, 1001):
+        hist.record(ms / 1000.0)
+
+    summary = hist.summary()
+    assert summary["count"] == 1000
+    assert abs(summary["p50"] - 0.5) / 0.5 <= 0.01
+    assert abs(summary["p99"] - 0.99) / 0.99 <= 0.01
+    assert summary["p99.9"] <= summary["max"] == 1.0
+
+
+def test_ticket_generator_duplicates_and_lengths():
+    gen = TicketGenerator(["Login fails with error 500"], duplicate_ratio=0.5,
+                          length_profile="long", seed=42)
+    tickets = [gen.next() for _ in range(400)]
+
+    duplicates = len(tickets) - len(set(tickets))
+    assert 150 <= duplicates <= 250
+    assert all(1500 <= len(t) <= MAX_DESCRIPTION_CHARS for t in tickets)
+
+
+def test_ticket_generator_honours_length_profiles():
+    base = seed_corpus_from_kb()
+    for profile in ("short", "mixed"):
+        gen = TicketGenerator(base, length_profile=profile, seed=7)
+        tickets = [gen.next() for _ in range(500)]
+        lo = min(b[1] for b in LENGTH_PROFILES[profile])
+        hi = max(b[2] for b in LENGTH_PROFILES[profile])
+        assert all(lo <= len(t) <= hi for t in tickets), profile
+        # The full base ticket survives padding/trimming
+        assert all(any(b in t for b in base) for t in tickets), profile
+
+
+def test_fit_exponent_detects_quadratic_scaling():
+    linear = [{"size": n, "median_s": n * 1e-6} for n in (100, 1000, 10000)]
+    quadratic = [{"size": n, "median_s": n * n * 1e-9} for n in (100, 1000, 10000)]
+
+    assert abs(fit_exponent(linear) - 1.0) < 1e-6
+    assert abs(fit_exponent(quadratic) - 2.0) < 1e-6
+    assert fit_exponent(linear[:1]) is None
@@ -0,0 +1,69 @@
+"""
+run: python -m pytest
+"""
+
+import asyncio
+
+import agent.tools as tools
+from agent.kb_index import LexicalIndex, PartitionedIndex, merge_hits
+from agent.offload import RetrievalExecutor
+
+KB = [
+    {"id": "A", "title": "Checkout error 500", "category": "Bug", "symptoms": ["checkout", "500"]},
+    {"id": "B", "title": "Login fails", "category": "Login", "symptoms": ["login", "password"]},
+    {"id": "C", "title": "Checkout is slow", "category": "Performance", "symptoms": ["checkout", "slow"]},
+    {"id": "D", "title": "App crash", "category": "Bug", "symptoms": ["crash", "startup"], "platform": "ios"},
+]
+
+
+def _partitioned():
+    index = LexicalIndex([frozenset(tools._tokenize(e["title"] + " " + " ".join(e["symptoms"]))) for e in KB])
+    return PartitionedIndex(index, KB)
+
+
+def test_plan_only_touches_requested_partitions():
+    pindex = _partitioned()
+
+    assert set(pindex.partitions) == {"Bug", "Login", "Performance"}
+    parts = pindex.plan(categories={"Bug", "Unknown"})
+    assert [positions for _, positions in parts] == [[0, 3]]
+
+    parts = pindex.plan(categories={"Bug"}, where=lambda e: e.get("platform") == "ios")
+    assert [(len(sub), positions) for sub, positions in parts] == [(1, [3])]
+    assert pindex.plan() == [(pindex.index, None)]
+
+
+def test_merge_hits_maps_back_to_global_positions():
+    merged = merge_hits([([(0, 0.5), (1, 0.2)], [2, 7]), ([(0, 0.9)], None)], top_n=2)
+    assert merged == [(0, 0.9), (2, 0.5)]
+
+
+def test_filtered_search_and_global_fallback(monkeypatch):
+    monkeypatch.setattr(tools, "KB_ENTRIES", KB)
+    monkeypatch.setattr(tools.settings, "KB_PARTITION_FALLBACK_SCORE", 0.5)
+
+    # Strong match inside the partition: Performance entries first, remaining slots from the whole KB
+    hits = asyncio.run(tools.search_kb_mock("checkout is slow", top_n=3, categories={"Performance"}))
+    assert [e["id"] for e in hits][:2] == ["C", "A"]
+    assert len(hits) == 3
+
+    # Weak match inside the partition: falls back to the whole KB
+    hits = asyncio.run(tools.search_kb_mock("checkout error 500", top_n=2, categories={"Login"}))
+    assert hits[0]["id"] == "A"
+    assert len(hits) == 2
+
+
+def test_filtered_plan_runs_off_loop_and_categories_map_to_kb():
+    pindex = _partitioned()
+    executor = RetrievalExecutor(mode="thread", max_workers=1, min_entries=0)
+    ios = lambda e: e.get("platform") == "ios"  # noqa: E731
+
+    try:
+        parts = asyncio.run(executor.plan(pindex, categories={"Bug"}, where=ios))
+        assert executor._pool is not None
+    finally:
+        executor.shutdown()
+
+    assert [positions for _, positions in parts] == [[3]]
+    assert tools.kb_categories("Question/How-To") == ["Question"]
+    assert tools.kb_categories("Login") == ["Login"]
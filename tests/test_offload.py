@@ -0,0 +1,78 @@
+"""
+run: python -m pytest
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from agent.kb_index import LexicalIndex, PartitionedIndex, VectorIndex, discard_published
+from agent.offload import RetrievalExecutor
+
+
+def _reference_vector_hits(matrix, query, top_n):
+    scored = [
+        (float(np.dot(row, query) / (np.linalg.norm(row) * np.linalg.norm(query))), i)
+        for i, row in enumerate(matrix)
+    ]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [i for _, i in scored[:top_n]]
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_executor_modes_return_the_same_hits(mode):
+    rng = np.random.default_rng(0)
+    raw = rng.standard_normal((50, 16))
+    query = rng.standard_normal(16)
+    vectors = VectorIndex.from_embeddings(raw.tolist())
+    lexical = LexicalIndex([frozenset({"login", "error"}), frozenset({"billing"}), frozenset({"login"})])
+    executor = RetrievalExecutor(mode=mode, max_workers=2, min_entries=0)
+
+    async def scenario():
+        return (
+            await executor.search(vectors, query, 5),
+            await executor.search(lexical, {"login", "error", "500"}, 2),
+        )
+
+    try:
+        vector_hits, lexical_hits = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+        discard_published(vectors, lexical)
+
+    assert [i for i, _ in vector_hits] == _reference_vector_hits(raw, query, 5)
+    assert lexical_hits == [(0, 1.0), (2, 1.0)]
+
+
+def test_small_indexes_stay_inline():
+    executor = RetrievalExecutor(mode="thread", min_entries=100)
+    index = LexicalIndex([frozenset({"a"})])
+
+    hits = asyncio.run(executor.search(index, {"a"}, 3))
+
+    assert hits == [(0, 1.0)]
+    assert executor._pool is None
+
+
+def test_published_files_are_removed_on_replace_and_shutdown():
+    entries = [{"category": "Login"}, {"category": "Billing"}, {"category": "Login"}]
+    lexical = PartitionedIndex(
+        LexicalIndex([frozenset({"login"}), frozenset({"billing"}), frozenset({"login", "error"})]), entries
+    )
+    executor = RetrievalExecutor(mode="process", max_workers=1, min_entries=0)
+
+    executor.prepare(lexical)
+    prepared = [sub._published for sub in lexical.shared_indexes()]
+    assert all(path and os.path.exists(path) for path in prepared)
+    executor.discard(lexical)
+    assert not any(os.path.exists(path) for path in prepared)
+
+    try:
+        asyncio.run(executor.search(lexical.index, {"login"}, 2))
+        published = lexical.index._published
+        assert published and os.path.exists(published)
+    finally:
+        executor.shutdown()
+    assert not os.path.exists(published)
@@ -0,0 +1,76 @@
+"""
+run: python -m pytest
+"""
+
+from agent.prompt import SYSTEM_PROMPT, build_messages, compact_description, count_tokens
+
+
+def test_strips_quoted_reply_and_signature():
+    description = (
+        "Checkout fails with error 500 when I pay.\n"
+        "Please help.\n"
+        "Best regards,\n"
+        "Jane Doe\n"
+        "ACME Corp\n"
+        "On Mon, 17 Nov 2025 Support wrote:\n"
+        "> Thanks for reaching out, can you share more details?\n"
+    )
+    text, _ = compact_description(description, token_budget=400)
+
+    assert "Checkout fails with error 500" in text
+    assert "Jane Doe" not in text
+    assert "reaching out" not in text
+
+
+def test_collapses_repeated_log_lines_and_stack_frames():
+    logs = "\n".join(
+        f"2025-11-19T10:21:{i:02d}Z ERROR request failed status=500 id={1000 + i}" for i in range(30)
+    )
+    frames = "\n".join(f'  File "/srv/app/mod{i}.py", line {i}, in fn{i}\n    call()' for i in range(20))
+    description = f"Uploads crash.\n{logs}\nTraceback (most recent call last):\n{frames}\nValueError: bad"
+
+    text, stats = compact_description(description, token_budget=400)
+
+    assert "[repeated 30x]" in text
+    assert "more frames" in text
+    assert "ValueError: bad" in text
+    assert stats["tokens_out"] < stats["tokens_in"]
+
+
+def test_caps_to_budget_keeping_informative_sentences():
+    filler = " ".join("We had a team meeting about the roadmap." for _ in range(200))
+    description = f"Dashboard is down and I cannot access my data. {filler} The API returns 503 errors."
+
+    text, stats = compact_description(description, token_budget=50)
+
+    assert stats["tokens_out"] <= 50
+    assert "cannot access" in text
+    assert "[...]" in text
+
+
+def test_short_ticket_is_sent_unchanged_with_static_prefix():
+    messages, stats = build_messages("I cannot login", token_budget=400)
+
+    assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert messages[1]["content"] == "I cannot login"
+    assert stats["tokens_in"] == stats["tokens_out"] == count_tokens("I cannot login")
+
+
+def test_signoff_mid_ticket_does_not_drop_the_rest():
+    description = "Login broken.\nThanks\nAlso the invoice page shows error 500 and data loss occurs."
+    text, _ = compact_description(description, token_budget=400)
+    assert "data loss occurs" in text
+
+    description = "From: the billing page I get error 500.\nIt started today."
+    text, _ = compact_description(description, token_budget=400)
+    assert text == description
+
+
+def test_single_punctuation_heavy_line_is_cut_to_budget():
+    description = ",".join(f"k{i}=v{i}" for i in range(600))[:4000]
+
+    text, stats = compact_description(description, token_budget=400)
+
+    assert stats["tokens_in"] > 400
+    assert stats["tokens_out"] <= 400
+    assert text.endswith("[...]")
@@ -0,0 +1,110 @@
+"""
+run: python -m pytest
+"""
+
+import asyncio
+
+from agent.result_store import TriageResultSink, cluster_unmatched, connect, frequent_unmatched
+
+
+def _record(description, known_issue=False, embedding=None, severity="High"):
+    return {
+        "description": description,
+        "summary": description,
+        "category": "Bug",
+        "severity": severity,
+        "known_issue": known_issue,
+        "related_issues": [{"id": "ISSUE-101", "title": "t", "category": "Bug", "match_score": 0.2}],
+        "next_action": "...",
+        "embedding": embedding,
+    }
+
+
+def test_sink_flushes_batches_and_finds_frequent_unmatched(tmp_path):
+    path = tmp_path / "triage_log.db"
+
+    async def scenario():
+        sink = TriageResultSink(path, batch_size=4, flush_interval=0.01)
+        await sink.start()
+        for severity in ("Medium", "Critical", "Low"):
+            sink.submit(_record("Dark mode switches  to light mode", severity=severity))
+        sink.submit(_record("dark mode switches to light mode"))
+        sink.submit(_record("Export to CSV is empty"))
+        sink.submit(_record("Checkout error 500", known_issue=True))
+        sink.submit(_record("Checkout error 500", known_issue=True))
+        await sink.stop()
+
+    asyncio.run(scenario())
+
+    conn = connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM triage_log").fetchone()[0] == 7
+    rows = frequent_unmatched(conn, min_count=2)
+    assert len(rows) == 1
+    assert rows[0]["count"] == 4
+    assert rows[0]["severity"] == "Critical"
+    assert rows[0]["best_score"] == 0.2
+
+
+def test_submit_never_blocks_and_drops_when_queue_is_full(tmp_path):
+    async def scenario():
+        sink = TriageResultSink(tmp_path / "log.db", max_queue=2, flush_interval=10)
+        assert sink.submit(_record("not started")) is False
+        await sink.start()
+        accepted = [sink.submit(_record(f"ticket {i}")) for i in range(5)]
+        await sink.stop()
+        return accepted
+
+    accepted = asyncio.run(scenario())
+    assert accepted == [True, True, False, False, False]
+
+
+def test_backed_up_queue_is_flushed_in_one_bigger_batch(tmp_path):
+    async def scenario():
+        sink = TriageResultSink(tmp_path / "log.db", batch_size=2, flush_interval=10)
+        await sink.start()
+        batches = []
+        write_batch = sink._write_batch
+        sink._write_batch = lambda batch: (batches.append(len(batch)), write_batch(batch))
+        for i in range(7):
+            sink.submit(_record(f"ticket {i}"))
+        await sink.stop()
+        return batches
+
+    assert asyncio.run(scenario()) == [7]
+
+
+def test_cluster_unmatched_groups_similar_embeddings(tmp_path):
+    path = tmp_path / "triage_log.db"
+
+    async def scenario():
+        sink = TriageResultSink(path, flush_interval=0.01)
+        await sink.start()
+        sink.submit(_record("App logs me out", embedding=[1.0, 0.0, 0.0]))
+        sink.submit(_record("I keep getting logged out", embedding=[0.99, 0.05, 0.0]))
+        sink.submit(_record("Export is empty", embedding=[0.0, 1.0, 0.0]))
+        await sink.stop()
+
+    asyncio.run(scenario())
+
+    clusters = cluster_unmatched(connect(path), threshold=0.9, min_count=1)
+    assert [c["count"] for c in clusters] == [2, 1]
+
+
+def test_coalesced_requests_log_one_row_per_caller(tmp_path, monkeypatch):
+    import agent.orchestrator as orchestrator
+
+    path = tmp_path / "triage_log.db"
+    sink = TriageResultSink(path, flush_interval=0.01)
+    monkeypatch.setattr(orchestrator, "result_sink", sink)
+    monkeypatch.setattr(orchestrator.settings, "MOCK_LLM", True)
+    monkeypatch.setattr(orchestrator.settings, "SINGLE_FLIGHT_ENABLED", True)
+
+    async def scenario():
+        await sink.start()
+        coalesced_before = orchestrator._inflight.coalesced
+        await asyncio.gather(*(orchestrator.triage_ticket("Export to CSV is empty") for _ in range(3)))
+        await sink.stop()
+        return orchestrator._inflight.coalesced - coalesced_before
+
+    assert asyncio.run(scenario()) == 2
+    assert connect(path).execute("SELECT COUNT(*) FROM triage_log").fetchone()[0] == 3
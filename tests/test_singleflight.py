@@ -0,0 +1,86 @@
+"""
+run: python -m pytest
+"""
+
+import asyncio
+
+from agent.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    async def scenario():
+        sf = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(sf.do("same", work) for _ in range(5)))
+        return sf, calls, results
+
+    sf, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert sf.coalesced == 4
+    assert all(r == {"value": 1} for r in results)
+    assert len(sf) == 0
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    async def scenario():
+        sf = SingleFlight()
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.create_task(sf.do("k", work))
+        await started.wait()
+        follower = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return leader, await follower
+
+    leader, follower_result = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert follower_result == "done"
+
+
+def test_work_is_cancelled_when_all_waiters_leave():
+    async def scenario():
+        sf = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        return sf
+
+    sf = asyncio.run(scenario())
+    assert len(sf) == 0
+
+
+def test_exceptions_propagate_to_all_waiters():
+    async def scenario():
+        sf = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,49 @@
+"""
+run: python -m pytest
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from agent.result_store import result_sink
+from app.main import app
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_is_cheap_and_side_effect_free():
+    # Fresh interpreter without an API key: nothing may be loaded or constructed yet
+    code = (
+        "import sys, app.main, agent.tools as tools; "
+        "assert tools.KB_ENTRIES is None and tools.llm_client is None and tools.client is None; "
+        "assert 'numpy' not in sys.modules and 'openai' not in sys.modules, sorted(sys.modules)"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_healthz_and_readyz_reflect_warm_up(tmp_path, monkeypatch):
+    # The lifespan starts the triage log: keep it out of the working tree
+    monkeypatch.setattr(result_sink, "path", tmp_path / "triage_log.db")
+    with TestClient(app) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+
+        deadline = time.time() + 10
+        resp = client.get("/readyz")
+        while resp.status_code != 200 and time.time() < deadline:
+            assert resp.json()["status"] == "warming_up"
+            time.sleep(0.05)
+            resp = client.get("/readyz")
+
+        report = resp.json()
+        assert resp.status_code == 200
+        assert report["status"] == "ready"
+        assert {"import", "kb", "total"} <= set(report["phases"])
+        assert report["within_budget"] is not None